@@ -1,84 +1,68 @@
 
 #       APP TP1 + TP2 + TP3
 
-from flask import Flask, render_template, request
-import networkx as nx
-import matplotlib.pyplot as plt
-import io, base64, uuid, json
+from flask import Flask, render_template, request, Response
+import json, time
 
-from tp1_algo import (
-    construire_abr, construire_avl, construire_tas, construire_amr, construire_btree,
-    arbre_to_nx, hauteur_arbre,
-    construire_graphe, densite_graphe
-)
+from tp1_algo import construire_abr, construire_avl, construire_amr, construire_btree, construire_tas, hauteur_arbre
+from tp1 import run_tp1
+from ingest import iter_values, guess_format, scalars_only, CountingIter
 
-from treap import Treap  
-
-plt.switch_backend('Agg')
+from treap_store import make_manager
+from tree_json import export_tree
+from rendering import graphe_to_image, LOD_BUDGET
+from render_pool import RenderPool, Overloaded, RenderTimeout, INTERACTIVE, NORMAL, BATCH
+import metrics
+from metrics import phase
 
 app = Flask(__name__)
+render_pool = RenderPool()
+metrics.init_app(app)
+metrics.registry.gauge('tp_render_pending', lambda: render_pool.pending)
+metrics.registry.gauge('tp_render_queued', lambda: render_pool.queued)
+metrics.registry.counter('tp_render_coalesced_total', lambda: render_pool.coalesced)
 
 
-#   Position hiérarchique
-
-def hierarchy_pos(G, root=None, width=1., vert_gap=0.2, vert_loc=0, xcenter=0.5):
-    if not nx.is_tree(G):
-        return nx.spring_layout(G)
-    if root is None:
-        root = next(iter(G.nodes))
-    def _hierarchy_pos(G, root, width=1., vert_gap=0.2, vert_loc=0, xcenter=0.5,
-                       pos=None, parent=None, parsed=None):
-        if pos is None:
-            pos = {root: (xcenter, vert_loc)}
-        if parsed is None:
-            parsed = set()
-        parsed.add(root)
-        neighbors = [n for n in G.neighbors(root) if n != parent]
-        if len(neighbors) != 0:
-            dx = width / len(neighbors)
-            nextx = xcenter - width/2 - dx/2
-            for neighbor in neighbors:
-                nextx += dx
-                pos[neighbor] = (nextx, vert_loc - vert_gap)
-                pos = _hierarchy_pos(G, neighbor, width=dx, vert_gap=vert_gap,
-                                     vert_loc=vert_loc - vert_gap, xcenter=nextx,
-                                     pos=pos, parent=root, parsed=parsed)
-        return pos
-    return _hierarchy_pos(G, root, width, vert_gap, vert_loc, xcenter)
-
-
-#   Dessin graphe / arbre
-
-def graphe_to_base64(G, figsize=(8, 6), title=None):
-    plt.figure(figsize=figsize)
-    try:
-        if nx.is_tree(G):
-            root = next(iter(G.nodes))
-            pos = hierarchy_pos(G, root=root, width=1.0, vert_gap=0.18, vert_loc=1.0, xcenter=0.5)
-        else:
-            pos = nx.spring_layout(G)
-    except Exception:
-        pos = nx.spring_layout(G)
+#   Cache HTTP (ETag)
+
+IMAGE_MIMETYPES = {'png': 'image/png', 'svg': 'image/svg+xml'}
 
-    nx.draw_networkx_nodes(G, pos, node_size=700, node_color='white', edgecolors='black', linewidths=1)
-    nx.draw_networkx_labels(G, pos, font_size=10)
-    nx.draw_networkx_edges(G, pos)
+def json_error(message, status):
+    return Response(json.dumps({'success': False, 'error': message}), status=status, mimetype='application/json')
 
-    if nx.is_weighted(G):
-        labels = nx.get_edge_attributes(G, 'weight')
-        nx.draw_networkx_edge_labels(G, pos, edge_labels=labels, font_size=8)
+def with_etag(response, etag):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def not_modified(etag):
+    """Réponse 304 si le client possède déjà la version `etag`, sinon None."""
+    if request.if_none_match.contains(etag):
+        return with_etag(Response(status=304), etag)
+    return None
+
+def etag_response(etag, produce, mimetype):
+    """Répond 304 si le client possède déjà la version `etag`, sinon appelle `produce`."""
+    response = not_modified(etag)
+    if response is None:
+        body = produce()
+        if body is None:
+            return None
+        response = with_etag(Response(body, mimetype=mimetype), etag)
+    return response
 
-    if title:
-        plt.title(title)
-    plt.axis('off')
-    plt.tight_layout()
 
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png', bbox_inches='tight', dpi=150)
-    buf.seek(0)
-    img_base64 = base64.b64encode(buf.getvalue()).decode('ascii')
-    plt.close()
-    return img_base64
+#   Erreurs du pool de rendu
+
+@app.errorhandler(Overloaded)
+def render_overloaded(e):
+    response = json_error('Serveur surchargé, réessayez', 503)
+    response.headers['Retry-After'] = '1'
+    return response
+
+@app.errorhandler(RenderTimeout)
+def render_timeout(e):
+    return json_error('Rendu trop long', 504)
 
 
 #           ROUTES
@@ -90,156 +74,53 @@ def index():
 
 # ---------- TP1 ----------
 @app.route('/tp1', methods=['GET', 'POST'])
-def tp1():
+async def tp1():
     resultats = {}
     if request.method == 'POST':
-        choix = request.form.getlist('choix')
-        valeurs_arbre_str = request.form.get('valeurs_arbre', '')
-        valeurs_graphe_str = request.form.get('valeurs_graphe', '')
-
-        valeurs_arbre = [int(v.strip()) for v in valeurs_arbre_str.split(',') if v.strip().lstrip('-').isdigit()]
-        valeurs_graphe = [v.strip() for v in valeurs_graphe_str.split(',') if v.strip()]
-
-        # --- ARBRE ---
-        if 'arbre' in choix and valeurs_arbre:
-            type_arbre = request.form.get('type_arbre', 'ABR')
-
-            if type_arbre == 'Tas':
-                type_tas = request.form.get('type_tas', 'min')
-                heap = construire_tas(valeurs_arbre, type_tas)
-                G = nx.Graph()
-                n = len(heap)
-                for i in range(n):
-                    G.add_node(str(heap[i]))
-                for i in range(n):
-                    left = 2*i+1
-                    right = 2*i+2
-                    if left < n:
-                        G.add_edge(str(heap[i]), str(heap[left]))
-                    if right < n:
-                        G.add_edge(str(heap[i]), str(heap[right]))
-                resultats['arbre_img'] = graphe_to_base64(G)
-                resultats['arbre_hauteur'] = n.bit_length() if n > 0 else 0
-                degres = dict(G.degree()).values()
-                resultats['arbre_degre'] = max(degres) if degres else 0
-                resultats['arbre_densite'] = nx.density(G)
-            else:
-                if type_arbre == 'ABR':
-                    root = construire_abr(valeurs_arbre)
-                elif type_arbre == 'AVL':
-                    root = construire_avl(valeurs_arbre)
-                elif type_arbre == 'AMR':
-                    nb_racines = request.form.get('nb_racines')
-                    try:
-                        nb_racines = int(nb_racines) if nb_racines else 2
-                    except:
-                        nb_racines = 2
-                    root = construire_amr(valeurs_arbre, nb_racines=nb_racines)
-                elif type_arbre == 'B-arbre':
-                    t = request.form.get('bordre')
-                    try:
-                        t = int(t) if t else 2
-                    except:
-                        t = 2
-                    root = construire_btree(valeurs_arbre, t=t)
-                else:
-                    root = construire_abr(valeurs_arbre)
-
-                if isinstance(root, list):
-                    G_arbre = nx.Graph()
-                    super_root = f"ROOT_{uuid.uuid4().hex[:6]}"
-                    for r in root:
-                        G_temp = arbre_to_nx(r)
-                        G_arbre = nx.compose(G_arbre, G_temp)
-                        G_arbre.add_node(super_root)
-                        G_arbre.add_edge(super_root, r.val)
-                    resultats['arbre_img'] = graphe_to_base64(G_arbre, title="AMR")
-                    resultats['arbre_hauteur'] = hauteur_arbre(root)
-                    degres = dict(G_arbre.degree()).values()
-                    resultats['arbre_degre'] = max(degres) if degres else 0
-                    resultats['arbre_densite'] = nx.density(G_arbre)
-                else:
-                    G_arbre = arbre_to_nx(root)
-                    resultats['arbre_img'] = graphe_to_base64(G_arbre)
-                    resultats['arbre_hauteur'] = hauteur_arbre(root)
-                    degres = dict(G_arbre.degree()).values()
-                    resultats['arbre_degre'] = max(degres) if degres else 0
-                    resultats['arbre_densite'] = nx.density(G_arbre)
-
-        # --- GRAPHE ---
-        if 'graphe' in choix and valeurs_graphe:
-            oriente = request.form.get('oriente') in ['on','true']
-            pondere = request.form.get('pondere') in ['on','true']
-            G_graph = construire_graphe(valeurs_graphe, oriente, pondere)
-            resultats['graphe_img'] = graphe_to_base64(G_graph)
-            degres = dict(G_graph.degree()).values()
-            resultats['graphe_degre'] = max(degres) if degres else 0
-            resultats['graphe_densite'] = densite_graphe(G_graph) if G_graph.number_of_nodes() > 0 else 0
+        form = request.form.to_dict()
+        form['choix'] = request.form.getlist('choix')
+        # Deux formulaires identiques en même temps partagent le même rendu
+        key = ('tp1', tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in form.items())))
+        resultats = await render_pool.run(run_tp1, form, key=key, priority=NORMAL)
 
     return render_template('tp1.html', resultats=resultats)
 
+def ingest_source():
+    """Flux de valeurs de la requête : fichier envoyé (champ 'file') ou corps brut."""
+    upload = request.files.get('file')
+    if upload is not None:
+        stream, fmt = upload.stream, guess_format(upload.filename, upload.mimetype)
+    else:
+        stream, fmt = request.stream, guess_format(mimetype=request.mimetype)
+    return iter_values(stream, request.args.get('format', fmt))
+
+@app.route('/tp1/ingest', methods=['POST'])
+def tp1_ingest():
+    """Construit l'arbre à partir d'un envoi CSV/NDJSON lu par morceaux ; renvoie ses statistiques."""
+    type_arbre = request.args.get('type_arbre', 'ABR')
+    start = time.perf_counter()
+    try:
+        # Les arbres de TP1 portent des nombres : les paires [clé, priorité] sont pour TP3
+        valeurs = CountingIter(scalars_only(ingest_source()))
+        if type_arbre == 'Tas':
+            with phase('build'):
+                heap = construire_tas(valeurs, request.args.get('type_tas', 'min'))
+            hauteur = len(heap).bit_length()
+        else:
+            builder = TP1_BUILDERS.get(type_arbre.lower().replace('b-arbre', 'btree'))
+            if builder is None:
+                return json_error(f"Type d'arbre inconnu : {type_arbre}", 400)
+            with phase('build'):
+                root = builder(valeurs, request.args)
+            with phase('algorithm'):
+                hauteur = hauteur_arbre(root)
+    except (TypeError, ValueError) as e:
+        return json_error(str(e), 400)
+    return json.dumps({'success': True, 'type_arbre': type_arbre, 'n': valeurs.n,
+                       'hauteur': hauteur, 'temps_sec': round(time.perf_counter() - start, 5)})
+
 # ---------- TP2 ----------
-class TreapManager:
-    def __init__(self):
-        self.trees = {}
-
-    def create_tree(self, heap_type='MAX'):
-        tree_id = str(uuid.uuid4())
-        self.trees[tree_id] = Treap(heap_type)
-        return tree_id
-
-    def insert(self, tree_id, key, priority):
-        tree = self.trees.get(tree_id)
-        if not tree:
-            return {"success": False, "error": "Arbre non trouvé"}
-        try:
-            tree.insert(int(key), float(priority))
-        except Exception as e:
-            return {"success": False, "error": str(e)}
-        return {"success": True}
-
-    def search(self, tree_id, key):
-        tree = self.trees.get(tree_id)
-        if not tree:
-            return {"success": False, "error": "Arbre non trouvé"}
-        found = tree.search(int(key))
-        return {"success": True, "found": found is not None}
-
-    def delete(self, tree_id, key):
-        tree = self.trees.get(tree_id)
-        if not tree:
-            return {"success": False, "error": "Arbre non trouvé"}
-        deleted = tree.delete(int(key))
-        return {"success": True, "deleted": deleted}
-
-    def get_tree_data(self, tree_id):
-        tree = self.trees.get(tree_id)
-        if not tree:
-            return {"size": 0, "height": 0, "operations": []}
-        stats = tree.get_stats()
-        return {"size": stats['nombre_noeuds'], "height": stats['hauteur'], "operations": tree.operations_log}
-
-    def get_visualization(self, tree_id):
-        tree = self.trees.get(tree_id)
-        if not tree or not tree.root:
-            return None
-        G = nx.DiGraph()
-        def add_edges(node):
-            if not node:
-                return
-            G.add_node(str(node.key))
-            if node.left:
-                G.add_node(str(node.left.key))
-                G.add_edge(str(node.key), str(node.left.key))
-                add_edges(node.left)
-            if node.right:
-                G.add_node(str(node.right.key))
-                G.add_edge(str(node.key), str(node.right.key))
-                add_edges(node.right)
-        add_edges(tree.root)
-        return graphe_to_base64(G)
-
-manager = TreapManager()
+manager = make_manager()
 
 @app.route('/tp2')
 def tp2_index():
@@ -258,42 +139,150 @@ def tp2_insert():
     tree_id = data.get('tree_id')
     key = data.get('key')
     priority = data.get('priority')
-    return json.dumps(manager.insert(tree_id, key, priority))
+    with phase('algorithm'):
+        result = manager.insert(tree_id, key, priority)
+    return json.dumps(result)
+
+@app.route('/tp2/insert_many', methods=['POST'])
+def tp2_insert_many():
+    data = request.json or {}
+    with phase('algorithm'):
+        result = manager.insert_many(data.get('tree_id'), data.get('items', []))
+    return json.dumps(result)
 
 @app.route('/tp2/search', methods=['POST'])
 def tp2_search():
     data = request.json or {}
     tree_id = data.get('tree_id')
     key = data.get('key')
-    return json.dumps(manager.search(tree_id, key))
+    with phase('algorithm'):
+        result = manager.search(tree_id, key)
+    return json.dumps(result)
 
 @app.route('/tp2/delete', methods=['POST'])
 def tp2_delete():
     data = request.json or {}
     tree_id = data.get('tree_id')
     key = data.get('key')
-    return json.dumps(manager.delete(tree_id, key))
+    with phase('algorithm'):
+        result = manager.delete(tree_id, key)
+    return json.dumps(result)
 
 @app.route('/tp2/tree_data/<tree_id>')
 def tp2_tree_data(tree_id):
-    data = manager.get_tree_data(tree_id)
-    return json.dumps({'success': True, 'data': data})
+    structure = request.args.get('structure') == '1'
+    state = manager.get_state(tree_id)
+    if state is None:
+        return json.dumps({'success': True, 'data': manager.get_tree_data(tree_id)})
+    etag = f"data-{tree_id}-{state[0]}-{state[1]}-{int(structure)}"
+    return etag_response(etag, lambda: json.dumps({'success': True, 'data': manager.get_tree_data(tree_id, structure)}),
+                         'application/json')
+
+@app.route('/tp2/stream/<tree_id>')
+def tp2_stream(tree_id):
+    """Flux SSE des deltas structurels d'un arbre (reprise via Last-Event-ID)."""
+    last = request.headers.get('Last-Event-ID') or request.args.get('since', '0')
+    try:
+        after = int(last)
+    except ValueError:
+        after = 0
+
+    def generate(after):
+        while True:
+            deltas = manager.deltas_since(tree_id, after)
+            if deltas is None:
+                yield 'event: gone\ndata: {}\n\n'
+                return
+            if not deltas:
+                yield ': keepalive\n\n'
+            for delta in deltas:
+                after = delta['seq']
+                yield f"id: {after}\ndata: {json.dumps(delta)}\n\n"
+
+    return Response(generate(after), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def lod_args(args):
+    """Paramètres de niveau de détail : depth (niveaux complets), budget (nœuds max), focus (clé)."""
+    def as_int(name):
+        value = args.get(name, '')
+        return int(value) if value.lstrip('-').isdigit() else None
+    budget = as_int('budget')
+    return as_int('depth'), max(1, budget) if budget else LOD_BUDGET, as_int('focus')
 
 @app.route('/tp2/visualization/<tree_id>')
-def tp2_visualization(tree_id):
-    image = manager.get_visualization(tree_id)
-    if not image:
-        return json.dumps({'success': False, 'error': 'Impossible de générer la visualisation'})
-    return json.dumps({'success': True, 'image': image})
+async def tp2_visualization(tree_id):
+    fmt = request.args.get('format', 'png').lower()
+    lod = lod_args(request.args)
+    state = manager.get_state(tree_id)
+    if fmt not in IMAGE_MIMETYPES or state is None:
+        return json_error('Impossible de générer la visualisation', 404)
+    etag = f"img-{tree_id}-{state[0]}-{fmt}-{'-'.join(map(str, lod))}"
+    response = not_modified(etag)
+    if response is not None:
+        return response
+
+    variant = (fmt, *lod)
+    image = manager.get_cached_image(tree_id, state[0], variant)
+    if image is None:
+        with phase('build'):
+            built = manager.visualization_graph(tree_id, *lod)
+        if built is None:
+            return json_error('Impossible de générer la visualisation', 404)
+        # Une écriture a pu arriver depuis get_state : cache et ETag suivent la version dessinée
+        version, G = built
+        etag = f"img-{tree_id}-{version}-{fmt}-{'-'.join(map(str, lod))}"
+        image = await render_pool.run(graphe_to_image, G, (8, 6), None, fmt,
+                                      key=('tp2', tree_id, version, variant), priority=INTERACTIVE)
+        manager.store_image(tree_id, version, variant, image)
+    return with_etag(Response(image, mimetype=IMAGE_MIMETYPES[fmt]), etag)
+
+# ---------- API JSON : arbres dessinés côté client ----------
+TP1_BUILDERS = {
+    'abr': lambda valeurs, args: construire_abr(valeurs),
+    'avl': lambda valeurs, args: construire_avl(valeurs),
+    'amr': lambda valeurs, args: construire_amr(valeurs, nb_racines=int(args.get('nb_racines', 2))),
+    'btree': lambda valeurs, args: construire_btree(valeurs, t=int(args.get('t', 2))),
+}
+
+@app.route('/api/tree/<kind>', methods=['GET', 'POST'])
+def api_tree(kind):
+    """Export JSON (format 'flat' ou 'nested') envoyé en flux, pour les clients qui dessinent eux-mêmes."""
+    args = request.args.to_dict()
+    if request.method == 'POST':
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            return json_error("Corps JSON attendu : un objet (ex. {\"values\": [5, 3, 8]})", 400)
+        args.update(body)
+    fmt = args.get('format', 'flat')
+    if fmt not in ('flat', 'nested'):
+        return json_error("Format invalide : choisissez 'flat' ou 'nested'", 400)
+
+    if kind == 'treap':
+        chunks = manager.export_tree(args.get('tree_id'), fmt)
+        if chunks is None:
+            return json_error('Arbre non trouvé', 404)
+        return Response(chunks, mimetype='application/json')
+
+    if kind not in TP1_BUILDERS:
+        return json_error(f"Type d'arbre inconnu : {kind}", 404)
+    valeurs = args.get('values', [])
+    try:
+        if isinstance(valeurs, str):
+            valeurs = [int(v) for v in valeurs.split(',') if v.strip()]
+        root = TP1_BUILDERS[kind]([int(v) for v in valeurs], args)
+    except (TypeError, ValueError) as e:
+        return json_error(str(e), 400)
+    return Response(export_tree(kind, root, fmt), mimetype='application/json')
 
 # ---------- TP3 : Insertion, Suppression, Tri ----------
 
-from flask import Flask, render_template, request
-from treap import Treap
-from tp3 import run_tp3
+from tp3 import run_tp3, load_treap, iter_sorted
+from external_sort import ExternalSort, RUN_SIZE
+from priorities import make_priority_source, available_sources
 
 @app.route("/tp3", methods=["GET", "POST"])
-def tp3_index():
+async def tp3_index():
     resultats = None
     if request.method == "POST":
         values_str = request.form.get("values", "")
@@ -301,12 +290,77 @@ def tp3_index():
         priority_mode = request.form.get("priority_mode", "auto")  
         heap_type = request.form.get("heap_type", "max").lower()   
         priorities_str = request.form.get("priorities", "")
-
-        resultats = run_tp3(values_str, method, priority_mode, heap_type, priorities_str)
-
-    return render_template("tp3.html", resultats=resultats)
+        priority_source = request.form.get("priority_source", "random")
+        seed = request.form.get("seed", "").strip()
+        seed = int(seed) if seed.lstrip('-').isdigit() else None
+        args = (values_str, method, priority_mode, heap_type, priorities_str, seed, priority_source)
+        try:
+            make_priority_source(priority_source)
+            # Sans graine, chaque exécution est différente : rien à partager
+            resultats = await render_pool.run(run_tp3, *args, key=('tp3', args) if seed is not None else None,
+                                              priority=BATCH)
+        except ValueError as e:
+            # Saisie invalide (source de priorités, clé ou priorité non numérique) : formulaire réaffiché
+            return render_template("tp3.html", resultats=None, sources=available_sources(), erreur=str(e)), 400
+
+    return render_template("tp3.html", resultats=resultats, sources=available_sources())
+
+@app.route("/tp3/ingest", methods=["POST"])
+def tp3_ingest():
+    """Tri par Treap d'un envoi CSV/NDJSON : lecture par morceaux, clés triées renvoyées en flux."""
+    method = request.args.get("method", "abr")
+    heap_type = request.args.get("heap_type", "max")
+    out_fmt = request.args.get("output", "csv")
+    start = time.perf_counter()
+    seed = request.args.get("seed")
+    try:
+        source = make_priority_source(request.args.get("priority_source", "random"),
+                                      int(seed) if seed is not None else None)
+        with phase('build'):
+            treap, inserted, duplicates = load_treap(ingest_source(), heap_type, source)
+    except ValueError as e:
+        return json_error(str(e), 400)
+    elapsed = round(time.perf_counter() - start, 5)
+
+    mimetype = "application/x-ndjson" if out_fmt == "ndjson" else "text/csv"
+    return Response(stream_keys(iter_sorted(treap, method)), mimetype=mimetype, headers={
+        "X-Keys-Inserted": str(inserted), "X-Duplicates-Ignored": str(duplicates),
+        "X-Build-Seconds": str(elapsed)})
+
+def stream_keys(keys):
+    """Clés triées envoyées une par ligne, par lots."""
+    batch = []
+    for key in keys:
+        batch.append(str(key))
+        if len(batch) >= 8192:
+            yield "\n".join(batch) + "\n"
+            batch = []
+    if batch:
+        yield "\n".join(batch) + "\n"
+
+@app.route("/tp3/external", methods=["POST"])
+def tp3_external():
+    """Tri externe d'un envoi de taille quelconque : séquences triées par Treap sur disque, puis fusion en flux."""
+    seed = request.args.get("seed")
+    run_size = request.args.get("run_size", "")
+    try:
+        source = make_priority_source(request.args.get("priority_source", "random"),
+                                      int(seed) if seed is not None else None)
+        sorter = ExternalSort(ingest_source(), int(run_size) if run_size.isdigit() else RUN_SIZE,
+                              heap_type=request.args.get("heap_type", "max"), source=source).run()
+    except ValueError as e:
+        return json_error(str(e), 400)
+    stats = sorter.stats
+    mimetype = "application/x-ndjson" if request.args.get("output") == "ndjson" else "text/csv"
+    return Response(stream_keys(sorter), mimetype=mimetype, headers={
+        "X-Keys-Sorted": str(stats["n"]), "X-Runs": str(stats["runs"]),
+        "X-Bytes-Spilled": str(stats["bytes_written"]),
+        "X-Run-Seconds": str(round(sum(stats["phases"].values()), 5))})
 
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    # Processus de rendu démarrés (matplotlib chargé) avant la première requête
+    render_pool.warm()
+    # threaded : les opérations JSON de TP2 n'attendent pas derrière les rendus
+    app.run(debug=True, threaded=True)
 
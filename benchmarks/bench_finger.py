@@ -0,0 +1,101 @@
+#       BENCHMARK RECHERCHE PAR DOIGT ET INSERTION GROUPÉE (Treap)
+
+# Compare, sur des flux de clés séquentiels, groupés et aléatoires :
+#   - n insertions une à une (Treap.insert) et une insertion groupée par lots
+#     triés (Treap.insert_many) dans un arbre déjà peuplé ;
+#   - des recherches depuis la racine et des recherches par doigt (Finger),
+#     en temps et en nœuds visités par recherche.
+#
+#   python benchmarks/bench_finger.py --n 50000 --base 50000 --batch 1000
+
+import argparse, os, random, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from treap import Treap
+
+
+def sequential(n, start, rng):
+    return list(range(start, start + n))
+
+
+def clustered(n, start, rng):
+    # Marche aléatoire à petits pas autour d'une position qui avance
+    keys, pos = [], start
+    for _ in range(n):
+        pos += rng.randint(-8, 12)
+        keys.append(pos)
+    return keys
+
+
+def uniform(n, start, rng):
+    return [rng.randrange(start, start + 20 * n) for _ in range(n)]
+
+
+WORKLOADS = {'séquentiel': sequential, 'groupé': clustered, 'aléatoire': uniform}
+
+
+def base_treap(size, rng):
+    treap = Treap('MAX')
+    keys = rng.sample(range(0, 4 * size), size)
+    treap.load((k, rng.uniform(0.001, 0.999)) for k in keys)
+    return treap
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def depth_sum(treap, keys):
+    total = 0
+    for key in keys:
+        node = treap.root
+        while node is not None:
+            total += 1
+            if key == node.key:
+                break
+            node = node.left if key < node.key else node.right
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--n', type=int, default=50000, help="clés insérées puis recherchées")
+    parser.add_argument('--base', type=int, default=50000, help="taille de l'arbre de départ")
+    parser.add_argument('--batch', type=int, default=1000, help="taille des lots de insert_many")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'flux':<12}{'insert (s)':>12}{'insert_many':>13}{'gain':>7}"
+          f"{'search (s)':>13}{'doigt (s)':>11}{'gain':>7}{'nœuds/rech.':>13}{'doigt':>7}")
+    for name, make in WORKLOADS.items():
+        rng = random.Random(args.seed)
+        keys = make(args.n, 4 * args.base, rng)
+        pairs = [(k, rng.uniform(0.001, 0.999)) for k in keys]
+
+        one = base_treap(args.base, random.Random(args.seed))
+        t_insert = timed(lambda: [one.insert(k, p) for k, p in pairs])
+
+        many = base_treap(args.base, random.Random(args.seed))
+
+        def batched():
+            for i in range(0, len(pairs), args.batch):
+                many.insert_many(sorted(pairs[i:i + args.batch]))
+        t_many = timed(batched)
+        # Mêmes clés (en cas de doublons dans le flux, la priorité retenue peut différer)
+        assert [k for k, _ in many.iter_inorder()] == [k for k, _ in one.iter_inorder()]
+
+        finger = many.finger()
+        t_search = timed(lambda: [many._search_node(many.root, k) for k in keys])
+        t_finger = timed(lambda: [finger.find(k) for k in keys])
+        per_root = depth_sum(many, keys) / len(keys)
+        per_finger = finger.steps / len(keys)
+
+        print(f"{name:<12}{t_insert:>12.3f}{t_many:>13.3f}{t_insert / t_many:>6.1f}x"
+              f"{t_search:>13.3f}{t_finger:>11.3f}{t_search / t_finger:>6.1f}x{per_root:>13.1f}{per_finger:>7.1f}")
+
+
+if __name__ == '__main__':
+    main()
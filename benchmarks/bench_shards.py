@@ -0,0 +1,65 @@
+#       BENCHMARK DU STOCKAGE RÉPARTI (débit selon le nombre de shards)
+
+# Lance les shards dans un répertoire temporaire, puis plusieurs processus
+# clients qui insèrent et recherchent des clés dans leurs propres arbres via
+# ShardedTreapManager. Affiche le débit total pour chaque nombre de shards.
+#
+#   python benchmarks/bench_shards.py --shards 1 2 4 --clients 8 --ops 5000
+
+import argparse, multiprocessing, os, random, sys, tempfile, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from treap_store import ShardedTreapManager, start_shards
+
+
+def client(n_shards, socket_dir, ops, seed, barrier, results):
+    manager = ShardedTreapManager(n_shards, socket_dir)
+    rng = random.Random(seed)
+    trees = [manager.create_tree('MAX') for _ in range(8)]
+    barrier.wait()
+    start = time.perf_counter()
+    for i in range(ops):
+        tree_id = trees[i % len(trees)]
+        key = rng.randrange(10 ** 6)
+        if i % 2 == 0:
+            manager.insert(tree_id, key, rng.uniform(0.01, 0.99))
+        else:
+            manager.search(tree_id, key)
+    results.put(time.perf_counter() - start)
+
+
+def run(n_shards, clients, ops):
+    socket_dir = tempfile.mkdtemp(prefix='tp-algo-bench-')
+    shards = start_shards(n_shards, socket_dir)
+    while not all(os.path.exists(os.path.join(socket_dir, f'shard-{i}.sock')) for i in range(n_shards)):
+        time.sleep(0.05)
+    barrier = multiprocessing.Barrier(clients)
+    results = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=client, args=(n_shards, socket_dir, ops, seed, barrier, results))
+             for seed in range(clients)]
+    for p in procs:
+        p.start()
+    elapsed = max(results.get() for _ in procs)
+    for p in procs + shards:
+        p.terminate()
+    return clients * ops / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--shards', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--ops', type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{'shards':>7}{'ops/s':>12}{'accélération':>14}")
+    base = None
+    for n in args.shards:
+        throughput = run(n, args.clients, args.ops)
+        base = base or throughput
+        print(f"{n:>7}{throughput:>12.0f}{throughput / base:>13.2f}x")
+
+
+if __name__ == '__main__':
+    main()
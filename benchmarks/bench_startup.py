@@ -0,0 +1,74 @@
+#       BENCHMARK DE DÉMARRAGE (temps d'import, mémoire)
+
+# Chaque module est importé dans un interpréteur neuf. Le script échoue si un
+# module de structures de données charge matplotlib ou networkx, ou si un
+# seuil passé en option est dépassé.
+#
+#   python benchmarks/bench_startup.py [--max-import-ms 500] [--max-rss-mb 80]
+
+"""Temps d'import et mémoire de chaque module (interpréteur neuf), puis coût du premier rendu."""
+
+import argparse, json, os, subprocess, sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules qui doivent rester importables sans bibliothèque graphique
+MODULES = ["treap", "tp1_algo", "tp3", "tree_json", "app"]
+HEAVY = ("matplotlib", "networkx")
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "import_ms": round(elapsed * 1000, 1),
+    "rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    "heavy": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+FIRST_RENDER = """
+import json, time
+import app
+from tp1_algo import construire_avl, arbre_to_nx
+start = time.perf_counter()
+app.graphe_to_image(arbre_to_nx(construire_avl([5, 3, 8, 1])))
+print(json.dumps({"first_render_ms": round((time.perf_counter() - start) * 1000, 1)}))
+"""
+
+
+def run(code):
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-import-ms", type=float, default=None)
+    parser.add_argument("--max-rss-mb", type=float, default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'module':<12}{'import (ms)':>14}{'RSS (Mo)':>12}  chargés")
+    for module in MODULES:
+        runs = [run(PROBE.format(module=module, heavy=HEAVY)) for _ in range(args.repeat)]
+        best = min(runs, key=lambda r: r["import_ms"])
+        print(f"{module:<12}{best['import_ms']:>14}{best['rss_mb']:>12}  {', '.join(best['heavy']) or '-'}")
+        if best["heavy"]:
+            failures.append(f"{module} importe {', '.join(best['heavy'])} au démarrage")
+        if args.max_import_ms is not None and best["import_ms"] > args.max_import_ms:
+            failures.append(f"{module} : import en {best['import_ms']} ms > {args.max_import_ms} ms")
+        if args.max_rss_mb is not None and best["rss_mb"] > args.max_rss_mb:
+            failures.append(f"{module} : RSS {best['rss_mb']} Mo > {args.max_rss_mb} Mo")
+
+    print(f"\nPremier rendu (chargement de matplotlib inclus) : {run(FIRST_RENDER)['first_render_ms']} ms")
+
+    for failure in failures:
+        print("ÉCHEC :", failure)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
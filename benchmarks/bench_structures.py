@@ -0,0 +1,543 @@
+#       BANC D'ESSAI ET VÉRIFICATION DES ARBRES (Treap, ABR, AVL, Tas, AMR, B-arbre)
+
+# Rejoue des flux de clés (aléatoire, trié, zigzag, doublons, priorités
+# adverses) sur chaque construction d'arbre, pour plusieurs graines, et relève
+# la distribution des hauteurs, les rotations et le temps par insertion.
+# Les insertions une à une sont vérifiées à intervalles réguliers pendant la
+# construction ; les constructions de TP1 (construire_*) et de TP3
+# (build_treap) partent du flux entier et sont vérifiées à la fin :
+#   - ordre ABR (parcours infixe trié, mêmes clés que le flux) ;
+#   - ordre de tas des priorités (Treap) ou des valeurs (Tas) ;
+#   - équilibre AVL, feuilles au même niveau (B-arbre) ;
+#   - hauteur/taille (et degré TP1) mis en cache sur les nœuds.
+# Les rotations AVL et celles de build_treap sont comptées en enveloppant les
+# fonctions de rotation le temps de la mesure.
+# Les résultats sont comparés à benchmarks/baselines.json : toute violation,
+# exception ou régression de hauteur ou de rotations donne un code de sortie 1.
+# Les temps sont rapportés à une boucle d'étalonnage mesurée dans le même
+# processus, pour rester comparables d'une machine à l'autre ; leurs écarts ne
+# sont que des avertissements, sauf avec --strict.
+#
+#   python benchmarks/bench_structures.py --n 500 --seeds 10
+#   python benchmarks/bench_structures.py --update-baselines
+
+import argparse, json, math, os, random, statistics, sys, time
+from collections import Counter
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tp1_algo
+from tp1_algo import (Node, insert_abr, insert_avl, construire_abr, construire_avl,
+                      construire_tas, construire_amr, construire_btree, hauteur_arbre)
+from tp3 import build_treap
+from treap import Treap
+
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+CHECKS = 4            # vérifications complètes par construction (la dernière en fin de flux)
+MAX_VIOLATIONS = 3    # messages gardés par construction
+
+
+#        FLUX DE CLÉS : (clés, priorités)
+
+def _priorities(n, rng):
+    return [rng.uniform(0.001, 0.999) for _ in range(n)]
+
+
+def aleatoire(n, rng):
+    return rng.sample(range(10 * n), n), _priorities(n, rng)
+
+
+def trie(n, rng):
+    return list(range(n)), _priorities(n, rng)
+
+
+def zigzag(n, rng):
+    # 0, n-1, 1, n-2, ... : chaque clé alterne entre les deux bords
+    keys = [i // 2 if i % 2 == 0 else n - 1 - i // 2 for i in range(n)]
+    return keys, _priorities(n, rng)
+
+
+def doublons(n, rng):
+    return [rng.randrange(max(1, n // 10)) for _ in range(n)], _priorities(n, rng)
+
+
+def adverse(n, rng):
+    # Clés dans le désordre, mais priorité croissante avec la clé : le Treap
+    # (tas MAX) dégénère en chaîne quel que soit l'ordre d'arrivée
+    keys = rng.sample(range(10 * n), n)
+    rank = {k: i for i, k in enumerate(sorted(keys))}
+    return keys, [(rank[k] + 1) / (n + 1) for k in keys]
+
+
+WORKLOADS = {'aléatoire': aleatoire, 'trié': trie, 'zigzag': zigzag,
+             'doublons': doublons, 'adverse': adverse}
+
+
+#        VÉRIFICATION
+
+def _inorder(root, left, right):
+    out, stack, node = [], [], root
+    while stack or node is not None:
+        while node is not None:
+            stack.append(node)
+            node = left(node)
+        node = stack.pop()
+        out.append(node)
+        node = right(node)
+    return out
+
+
+def verifier(root, expected, key, strict, beats=None, avl=False, cached=False):
+    """Parcours itératif de l'arbre ; renvoie (hauteur, violations).
+
+    `beats(enfant, parent)` signale un enfant plus prioritaire que son parent (tas),
+    `cached` compare hauteur/taille/degré stockés sur les nœuds aux valeurs recalculées."""
+    violations = []
+    left, right = (lambda n: n.left), (lambda n: n.right)
+    nodes = _inorder(root, left, right)
+    keys = [key(n) for n in nodes]
+    if keys != expected:
+        bad = next((i for i in range(1, len(keys))
+                    if keys[i] < keys[i - 1] or (strict and keys[i] == keys[i - 1])), None)
+        if bad is not None:
+            violations.append(f"ordre ABR : {keys[bad - 1]!r} avant {keys[bad]!r}")
+        else:
+            violations.append(f"clés : {len(keys)} dans l'arbre, {len(expected)} attendues")
+
+    # Infos (hauteur, taille, degré) des fils avant celles du père : ordre postfixe
+    post, stack = [], [root] if root is not None else []
+    while stack:
+        node = stack.pop()
+        post.append(node)
+        stack.extend(c for c in (node.left, node.right) if c is not None)
+    info = {}
+    for node in reversed(post):
+        kids = [c for c in (node.left, node.right) if c is not None]
+        h = [info[id(c)][0] for c in (node.left, node.right) if c is not None]
+        height = 1 + max(h, default=0)
+        size = 1 + sum(info[id(c)][1] for c in kids)
+        degre = max(len(kids) + 1, max((info[id(c)][2] for c in kids), default=0))
+        info[id(node)] = (height, size, degre)
+        if beats is not None:
+            for c in kids:
+                if beats(c, node):
+                    violations.append(f"tas : {key(c)!r} plus prioritaire que son parent {key(node)!r}")
+        if avl:
+            hl = info[id(node.left)][0] if node.left is not None else 0
+            hr = info[id(node.right)][0] if node.right is not None else 0
+            if abs(hl - hr) > 1:
+                violations.append(f"AVL : déséquilibre {hl - hr:+d} sous {key(node)!r}")
+        if cached:
+            stored = (node.height, node.size, getattr(node, 'degre', degre))
+            if stored != (height, size, degre):
+                violations.append(f"cache : {key(node)!r} garde {stored}, attendu {(height, size, degre)}")
+    return (info[id(root)][0] if root is not None else 0), violations
+
+
+def verifier_tas(heap, keys):
+    """Tas binaire en tableau (min) : mêmes valeurs que le flux, aucun enfant inférieur à son parent."""
+    violations = []
+    if Counter(heap) != Counter(keys):
+        violations.append(f"valeurs : {len(heap)} dans le tas, {len(keys)} attendues")
+    bad = next((i for i in range(1, len(heap)) if heap[i] < heap[(i - 1) // 2]), None)
+    if bad is not None:
+        violations.append(f"tas : {heap[bad]!r} sous {heap[(bad - 1) // 2]!r}")
+    return len(heap).bit_length(), violations
+
+
+def _cle(node):
+    return node.keys if hasattr(node, 'keys') else node.val
+
+
+def _cles_infixe(roots):
+    """Clés d'une forêt n-aire, chaque clé d'un nœud entre deux de ses enfants (ordre B-arbre)."""
+    out, stack = [], [(r, 0) for r in reversed(roots)]
+    while stack:
+        node, i = stack.pop()
+        keys = node.keys if hasattr(node, 'keys') else [node.val]
+        if not node.children:
+            out.extend(keys)
+            continue
+        if 0 < i <= len(keys):
+            out.append(keys[i - 1])
+        if i < len(node.children):
+            stack.append((node, i + 1))
+            stack.append((node.children[i], 0))
+    return out
+
+
+def verifier_naire(roots, keys, ordered):
+    """Forêt d'arbres n-aires (AMR, B-arbre) ; renvoie (profondeurs des feuilles, violations).
+
+    Mêmes clés que le flux (triées si `ordered`) et cache des nœuds égal aux
+    valeurs recalculées."""
+    violations, leaves = [], set()
+    post, stack = [], [(r, 1) for r in roots]
+    while stack:
+        node, depth = stack.pop()
+        post.append(node)
+        if not node.children:
+            leaves.add(depth)
+        stack.extend((c, depth + 1) for c in node.children)
+    info = {}
+    for node in reversed(post):
+        kids = node.children
+        height = 1 + max((info[id(c)][0] for c in kids), default=0)
+        size = 1 + sum(info[id(c)][1] for c in kids)
+        degre = max(len(kids) + 1, max((info[id(c)][2] for c in kids), default=0))
+        info[id(node)] = (height, size, degre)
+        stored = (node.height, node.size, node.degre)
+        if stored != (height, size, degre):
+            violations.append(f"cache : {_cle(node)!r} garde {stored}, attendu {(height, size, degre)}")
+    found = _cles_infixe(roots)
+    if ordered and found != sorted(keys):
+        bad = next((i for i in range(1, len(found)) if found[i] < found[i - 1]), None)
+        violations.append(f"ordre : {found[bad - 1]!r} avant {found[bad]!r}" if bad is not None
+                          else f"clés : {len(found)} dans l'arbre, {len(keys)} attendues")
+    elif not ordered and Counter(found) != Counter(keys):
+        violations.append(f"clés : {len(found)} dans la forêt, {len(keys)} attendues")
+    return leaves, violations
+
+
+@contextmanager
+def compter_appels(owner, *names):
+    """Enveloppe les fonctions `names` de `owner` le temps du bloc ; renvoie [nombre d'appels]."""
+    calls = [0]
+    saved = {name: getattr(owner, name) for name in names}
+
+    def counted(fn):
+        def wrapper(*args, **kwargs):
+            calls[0] += 1
+            return fn(*args, **kwargs)
+        return wrapper
+
+    for name, fn in saved.items():
+        setattr(owner, name, counted(fn))
+    try:
+        yield calls
+    finally:
+        for name, fn in saved.items():
+            setattr(owner, name, fn)
+
+
+#        CONSTRUCTIONS
+
+class TreapInsert:
+    name = 'Treap'
+    checks = CHECKS
+
+    def __init__(self, batch):
+        self.treap = Treap('MAX')
+        self.rotations = 0
+        self.treap.subscribe(self._count)
+
+    def _count(self, delta):
+        self.rotations += len(delta.get('rotations', ()))
+
+    def feed(self, pairs):
+        for key, priority in pairs:
+            self.treap.insert(key, priority)
+
+    def check(self, keys):
+        beats = lambda c, p: self.treap._compare_priority(c.priority, p.priority)
+        return verifier(self.treap.root, sorted(set(keys)), lambda n: n.key, True, beats=beats, cached=True)
+
+
+class TreapBatch(TreapInsert):
+    # Lots triés de `batch` clés : arbre cartésien puis union, sans rotations
+    name = 'Treap lot'
+
+    def __init__(self, batch):
+        super().__init__(batch)
+        self.batch = batch
+
+    def feed(self, pairs):
+        for i in range(0, len(pairs), self.batch):
+            self.treap.insert_many(sorted(pairs[i:i + self.batch]))
+
+
+class ABR:
+    name = 'ABR'
+    checks = CHECKS
+
+    def __init__(self, batch):
+        self.root = None
+        self.rotations = 0
+
+    def feed(self, pairs):
+        for key, _ in pairs:
+            if self.root is None:
+                self.root = Node(key)
+            else:
+                insert_abr(self.root, key)
+
+    def check(self, keys):
+        return verifier(self.root, sorted(keys), lambda n: n.val, False, cached=True)
+
+
+class AVL(ABR):
+    name = 'AVL'
+
+    def feed(self, pairs):
+        root = self.root
+        with compter_appels(tp1_algo, 'rotate_left', 'rotate_right') as calls:
+            for key, _ in pairs:
+                root = insert_avl(root, key)
+        self.root = root
+        self.rotations += calls[0]
+
+    def check(self, keys):
+        return verifier(self.root, sorted(keys), lambda n: n.val, False, avl=True, cached=True)
+
+
+# Constructions en un appel sur le flux entier (TP1 et TP3), vérifiées une fois à la fin
+
+class TreapTP3(TreapInsert):
+    name = 'Treap TP3'
+    checks = 1
+
+    def __init__(self, batch):
+        self.treap = None
+        self.rotations = 0
+
+    def feed(self, pairs):
+        keys, priorities = [k for k, _ in pairs], [p for _, p in pairs]
+        with compter_appels(Treap, '_rotate_left', '_rotate_right') as calls:
+            self.treap, _ = build_treap(keys, "manual", priorities, "MAX")
+        self.rotations += calls[0]
+
+
+class ABRConstruit(ABR):
+    name = 'ABR constr.'
+    checks = 1
+
+    def feed(self, pairs):
+        self.root = construire_abr(k for k, _ in pairs)
+
+
+class AVLConstruit(AVL):
+    name = 'AVL constr.'
+    checks = 1
+
+    def feed(self, pairs):
+        with compter_appels(tp1_algo, 'rotate_left', 'rotate_right') as calls:
+            self.root = construire_avl(k for k, _ in pairs)
+        self.rotations += calls[0]
+
+
+class Tas:
+    name = 'Tas'
+    checks = 1
+
+    def __init__(self, batch):
+        self.heap = []
+        self.rotations = 0
+
+    def feed(self, pairs):
+        self.heap = construire_tas([k for k, _ in pairs], "min")
+
+    def check(self, keys):
+        return verifier_tas(self.heap, keys)
+
+
+class AMR:
+    name = 'AMR'
+    checks = 1
+
+    def __init__(self, batch):
+        self.roots = []
+        self.rotations = 0
+
+    def feed(self, pairs):
+        # Une racine et deux enfants par arbre : assez de racines pour placer toutes les clés
+        self.roots = construire_amr([k for k, _ in pairs], nb_racines=-(-len(pairs) // 3))
+
+    def check(self, keys):
+        _, violations = verifier_naire(self.roots, keys, ordered=False)
+        return hauteur_arbre(self.roots), violations
+
+
+class BArbre:
+    # construire_btree garde toutes les clés dans la racine (pas d'éclatement) :
+    # la capacité des nœuds (2t - 1 clés) n'est donc pas vérifiée
+    name = 'B-arbre'
+    checks = 1
+
+    def __init__(self, batch):
+        self.root = None
+        self.rotations = 0
+
+    def feed(self, pairs):
+        self.root = construire_btree([k for k, _ in pairs], t=2)
+
+    def check(self, keys):
+        leaves, violations = verifier_naire([self.root], keys, ordered=True)
+        if len(leaves) > 1:
+            violations.append(f"B-arbre : feuilles aux profondeurs {sorted(leaves)}")
+        return self.root.height, violations
+
+
+BUILDERS = [TreapInsert, TreapBatch, TreapTP3, ABR, AVL, ABRConstruit, AVLConstruit, Tas, AMR, BArbre]
+
+
+def replay(builder, keys, priorities):
+    """Construit l'arbre par tranches (`builder.checks`), en vérifiant les invariants après chacune."""
+    pairs = list(zip(keys, priorities))
+    step = max(1, -(-len(pairs) // builder.checks))
+    seconds, violations, height = 0.0, [], 0
+    for i in range(0, len(pairs), step):
+        start = time.perf_counter()
+        builder.feed(pairs[i:i + step])
+        seconds += time.perf_counter() - start
+        height, found = builder.check(keys[:i + step])
+        violations += found
+    return height, builder.rotations, seconds, violations
+
+
+#        ÉTALONNAGE
+
+def calibrate(repeat=3, lookups=5000):
+    """Durée (s) d'une recherche dans un ABR fixe de 1000 clés, meilleure de `repeat` mesures.
+
+    Même genre de travail que les constructions mesurées (attributs, comparaisons) :
+    un temps divisé par cette unité dépend peu de la machine."""
+    rng = random.Random(0)
+    root = Node(500)
+    for k in rng.sample(range(1000), 1000):
+        insert_abr(root, k)
+    keys = [rng.randrange(1000) for _ in range(lookups)]
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for k in keys:
+            node = root
+            while node is not None and node.val != k:
+                node = node.left if k < node.val else node.right
+        best = min(best, time.perf_counter() - start)
+    return best / lookups
+
+
+#        RÉSULTATS ET RÉFÉRENCES
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def summarize(heights, rotations, seconds, n, unit):
+    # Graine la plus rapide : la moins perturbée par les autres processus de la machine
+    per_op = min(seconds) / n
+    return {'height_mean': round(statistics.mean(heights), 2),
+            'height_p95': percentile(heights, 0.95),
+            'height_max': max(heights),
+            'rotations_per_op': round(statistics.mean(rotations) / n, 3),
+            'time_per_op': round(per_op / unit, 2),
+            'us_per_op': round(per_op * 1e6, 2)}
+
+
+# Métriques comparées aux références : structure (bloquante) et temps étalonné (avertissement)
+STRUCTURE = ('height_mean', 'height_p95', 'height_max', 'rotations_per_op')
+TIMING = ('time_per_op',)
+
+
+def regressions(name, result, baseline, metrics, tolerance):
+    """Métriques pires que la référence au-delà de la tolérance (relative)."""
+    found = []
+    for metric in metrics:
+        value, ref = result[metric], baseline.get(metric)
+        if ref is not None and value > ref * (1 + tolerance) + 1e-9:
+            found.append(f"{name} : {metric} {value} > référence {ref} (+{tolerance:.0%})")
+    return found
+
+
+def load_baselines(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--n', type=int, default=500, help="clés par flux")
+    parser.add_argument('--seeds', type=int, default=10, help="nombre de graines par flux")
+    parser.add_argument('--seed', type=int, default=1, help="première graine")
+    parser.add_argument('--batch', type=int, default=64, help="taille des lots de insert_many")
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help="écart relatif toléré sur hauteurs et rotations")
+    parser.add_argument('--time-tolerance', type=float, default=0.5,
+                        help="écart relatif toléré sur le temps étalonné par insertion")
+    parser.add_argument('--strict', action='store_true',
+                        help="un temps au-delà de la tolérance fait aussi échouer")
+    parser.add_argument('--baselines', default=BASELINES)
+    parser.add_argument('--update-baselines', action='store_true',
+                        help="enregistre les résultats comme nouvelles références")
+    args = parser.parse_args()
+
+    params = {'n': args.n, 'seeds': args.seeds, 'seed': args.seed, 'batch': args.batch}
+    stored = load_baselines(args.baselines)
+    if stored is not None and stored.get('params') != params:
+        print(f"Références calculées avec {stored.get('params')}, comparaison ignorée.")
+        stored = None
+    baselines = stored['results'] if stored else {}
+
+    results, failures, worse, slower = {}, [], [], []
+    log2n = math.log2(max(args.n, 2))
+    print("unités : temps par insertion / recherche de référence dans un ABR de 1000 clés")
+    print(f"{'flux':<11}{'structure':<13}{'h moy':>7}{'h p95':>7}{'h max':>7}{'h/log2 n':>10}"
+          f"{'rot/op':>8}{'µs/op':>8}{'unités':>8}  état")
+    for wname, make in WORKLOADS.items():
+        for cls in BUILDERS:
+            name = f"{wname}/{cls.name}"
+            heights, rotations, seconds, errors = [], [], [], []
+            # Étalonné juste avant chaque case : suit les variations de charge de la machine
+            unit = calibrate()
+            for seed in range(args.seed, args.seed + args.seeds):
+                keys, priorities = make(args.n, random.Random(seed))
+                try:
+                    height, rot, sec, violations = replay(cls(args.batch), keys, priorities)
+                except Exception as e:
+                    errors.append(f"graine {seed} : {type(e).__name__}: {e}")
+                    continue
+                errors += [f"graine {seed} : {v}" for v in violations[:MAX_VIOLATIONS]]
+                heights.append(height)
+                rotations.append(rot)
+                seconds.append(sec)
+            failures += [f"{name} : {e}" for e in errors]
+            if not heights:
+                print(f"{wname:<11}{cls.name:<13}{'—':>7}{'—':>7}{'—':>7}{'—':>10}{'—':>8}{'—':>8}{'—':>8}  ÉCHEC")
+                continue
+            result = results[name] = summarize(heights, rotations, seconds, args.n, unit)
+            baseline = baselines.get(name, {})
+            structure = regressions(name, result, baseline, STRUCTURE, args.tolerance)
+            timing = regressions(name, result, baseline, TIMING, args.time_tolerance)
+            worse += structure
+            slower += timing
+            state = ('ÉCHEC' if errors else 'RÉGRESSION' if structure or (timing and args.strict)
+                     else 'lent' if timing else 'ok')
+            print(f"{wname:<11}{cls.name:<13}{result['height_mean']:>7.1f}{result['height_p95']:>7}"
+                  f"{result['height_max']:>7}{result['height_mean'] / log2n:>10.2f}"
+                  f"{result['rotations_per_op']:>8.2f}{result['us_per_op']:>8.1f}"
+                  f"{result['time_per_op']:>8.1f}  {state}")
+
+    for message in failures:
+        print(f"VIOLATION {message}")
+    if args.update_baselines:
+        if failures:
+            print("Invariants violés : références non mises à jour.")
+            return 1
+        with open(args.baselines, 'w', encoding='utf-8') as f:
+            json.dump({'params': params, 'results': results}, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"Références enregistrées dans {args.baselines}")
+        return 0
+    for message in worse:
+        print(f"RÉGRESSION {message}")
+    for message in slower:
+        print(f"{'RÉGRESSION' if args.strict else 'AVERTISSEMENT'} {message}")
+    return 1 if failures or worse or (slower and args.strict) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
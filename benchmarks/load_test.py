@@ -0,0 +1,97 @@
+#       TEST DE CHARGE (trafic mixte rendus / opérations TP2)
+
+# Envoie en parallèle des rendus lourds (TP1, TP3) et des opérations JSON
+# de TP2 vers un serveur déjà lancé, puis affiche les latences p50/p95/p99
+# par classe de requêtes. Les 503 (pool de rendu saturé) sont comptés à part.
+#
+#   python app.py &
+#   python benchmarks/load_test.py --url http://127.0.0.1:5000 --duration 20
+
+import argparse, json, random, threading, time
+import urllib.error, urllib.parse, urllib.request
+
+
+def request(url, data=None, json_body=None):
+    headers = {}
+    if json_body is not None:
+        data = json.dumps(json_body).encode()
+        headers['Content-Type'] = 'application/json'
+    elif data is not None:
+        data = urllib.parse.urlencode(data, doseq=True).encode()
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data, headers=headers), timeout=60) as r:
+            body = r.read()
+            status = r.status
+    except urllib.error.HTTPError as e:
+        body, status = e.read(), e.code
+    return status, body, time.perf_counter() - start
+
+
+def percentile(values, p):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--render-ratio', type=float, default=0.2,
+                        help="part des requêtes qui déclenchent un rendu matplotlib")
+    parser.add_argument('--tree-size', type=int, default=60)
+    args = parser.parse_args()
+
+    status, body, _ = request(f'{args.url}/tp2/create_tree', json_body={'heap_type': 'MAX'})
+    tree_id = json.loads(body)['tree_id']
+    valeurs = ','.join(str(v) for v in random.sample(range(10 * args.tree_size), args.tree_size))
+
+    def render_tp1():
+        return request(f'{args.url}/tp1', data={'choix': ['arbre'], 'valeurs_arbre': valeurs, 'type_arbre': 'AVL'})
+
+    def render_tp3():
+        return request(f'{args.url}/tp3', data={'values': valeurs, 'method': 'abr'})
+
+    def tp2_insert():
+        return request(f'{args.url}/tp2/insert', json_body={
+            'tree_id': tree_id, 'key': random.randint(0, 10 ** 6), 'priority': random.uniform(0.01, 0.99)})
+
+    def tp2_search():
+        return request(f'{args.url}/tp2/search', json_body={'tree_id': tree_id, 'key': random.randint(0, 10 ** 6)})
+
+    classes = {'render': [render_tp1, render_tp3], 'tp2_json': [tp2_insert, tp2_search]}
+    latencies = {name: [] for name in classes}
+    rejected = {name: 0 for name in classes}
+    errors = {name: 0 for name in classes}
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.duration
+
+    def client():
+        while time.monotonic() < deadline:
+            name = 'render' if random.random() < args.render_ratio else 'tp2_json'
+            status, _, elapsed = random.choice(classes[name])()
+            with lock:
+                if status == 503:
+                    rejected[name] += 1
+                elif status >= 400:
+                    errors[name] += 1
+                else:
+                    latencies[name].append(elapsed)
+
+    threads = [threading.Thread(target=client) for _ in range(args.clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    print(f"{'classe':<10}{'ok':>7}{'503':>6}{'err':>6}{'p50 (ms)':>11}{'p95 (ms)':>11}{'p99 (ms)':>11}")
+    for name, values in latencies.items():
+        p50, p95, p99 = (percentile(values, p) * 1000 for p in (50, 95, 99))
+        print(f"{name:<10}{len(values):>7}{rejected[name]:>6}{errors[name]:>6}{p50:>11.1f}{p95:>11.1f}{p99:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
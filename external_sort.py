@@ -0,0 +1,202 @@
+#       TRI EXTERNE PAR TREAP (entrées plus grandes que la mémoire)
+
+# Les clés arrivent en flux et sont découpées en séquences de `run_size`
+# clés. Chaque séquence est triée par un Treap (parcours en ordre), puis
+# écrite dans un fichier temporaire, une clé JSON par ligne : entiers et
+# flottants (validés à l'ingestion) sont relus à l'identique. Les séquences
+# sont ensuite fusionnées par un tas (heapq.merge) ; au-delà de `fan_in`
+# fichiers, la fusion se fait en plusieurs passes. La mémoire reste bornée
+# par `run_size` nœuds, quelle que soit la taille de l'entrée.
+#
+#   python external_sort.py donnees.csv -o triees.txt --run-size 200000
+
+import argparse, heapq, json, os, shutil, sys, tempfile, time
+from itertools import islice
+
+from metrics import collect, phase
+from priorities import make_priority_source
+from treap import Treap
+
+RUN_SIZE = 100_000
+FAN_IN = 64
+_WRITE_BATCH = 8192
+
+
+class ExternalSort:
+    """Tri externe d'un flux de clés (ou de paires [clé, priorité]) ; itérer produit les clés triées.
+
+    Les statistiques (`stats`) sont complétées au fil du tri : séquences,
+    passes de fusion, octets écrits et relus, durée des phases."""
+
+    def __init__(self, values, run_size=RUN_SIZE, fan_in=FAN_IN, heap_type="max", source=None, tmpdir=None):
+        if run_size < 1 or fan_in < 2:
+            raise ValueError("run_size doit être >= 1 et fan_in >= 2.")
+        self.values = iter(values)
+        self.run_size = run_size
+        self.fan_in = fan_in
+        self.heap_type = heap_type
+        self.source = source or make_priority_source()
+        self.tmpdir = tmpdir
+        self.workdir = None
+        self.stats = {"n": 0, "runs": 0, "passes": 0, "bytes_written": 0, "bytes_read": 0, "phases": {}}
+        self.runs = None
+        self._seq = 0
+
+    def _sort_run(self, chunk):
+        """Trie une séquence avec un Treap ; (clé, numéro) rend chaque clé unique et garde les doublons."""
+        keys, priorities, missing = [], [], []
+        for v in chunk:
+            if isinstance(v, list):
+                key, priority = v[0], v[1]
+            else:
+                key, priority = v, None
+                missing.append(len(keys))
+            keys.append((key, self._seq))
+            priorities.append(priority)
+            self._seq += 1
+        for i, p in zip(missing, self.source.batch([keys[i][0] for i in missing])):
+            priorities[i] = p
+        treap = Treap(self.heap_type.upper())
+        treap.load(zip(keys, priorities))
+        return [key for (key, _), _ in treap.iter_inorder()]
+
+    def _write(self, path, keys):
+        keys, written = iter(keys), 0
+        with open(path, "wb") as f:
+            while True:
+                batch = list(islice(keys, _WRITE_BATCH))
+                if not batch:
+                    break
+                data = ("\n".join(map(json.dumps, batch)) + "\n").encode()
+                f.write(data)
+                written += len(data)
+        self.stats["bytes_written"] += written
+        return path
+
+    def _read(self, path):
+        with open(path, "rb") as f:
+            for line in f:
+                self.stats["bytes_read"] += len(line)
+                yield json.loads(line)
+
+    def _open(self, run):
+        return iter(run) if isinstance(run, list) else self._read(run)
+
+    def make_runs(self):
+        """Lit l'entrée par séquences, les trie et les écrit sur disque ; renvoie les chemins.
+
+        Une entrée qui tient dans une seule séquence reste en mémoire (liste de clés)."""
+        runs = []
+        while True:
+            with phase("parse"):
+                chunk = list(islice(self.values, self.run_size))
+            if not chunk:
+                break
+            self.stats["n"] += len(chunk)
+            with phase("build"):
+                keys = self._sort_run(chunk)
+            self.stats["runs"] += 1
+            if not runs and len(chunk) < self.run_size:
+                return [keys]
+            if self.workdir is None:
+                self.workdir = tempfile.mkdtemp(prefix="tp3-tri-externe-", dir=self.tmpdir)
+            with phase("spill"):
+                runs.append(self._write(os.path.join(self.workdir, f"run-{len(runs)}.txt"), keys))
+        return runs
+
+    def _reduce(self, runs):
+        """Fusionne par groupes de `fan_in` jusqu'à pouvoir tout fusionner en une passe."""
+        while len(runs) > self.fan_in:
+            self.stats["passes"] += 1
+            merged = []
+            for i in range(0, len(runs), self.fan_in):
+                group = runs[i:i + self.fan_in]
+                path = os.path.join(self.workdir, f"pass-{self.stats['passes']}-{len(merged)}.txt")
+                with phase("merge"):
+                    self._write(path, heapq.merge(*(self._open(r) for r in group)))
+                for r in group:
+                    os.unlink(r)
+                merged.append(path)
+            runs = merged
+        return runs
+
+    def run(self):
+        """Première étape, exécutée d'un bloc : séquences triées et fusions intermédiaires."""
+        try:
+            with collect() as phases:
+                self.runs = self._reduce(self.make_runs())
+        except BaseException:
+            self.cleanup()
+            raise
+        self.stats["phases"].update(phases)
+        return self
+
+    def __iter__(self):
+        """Fusion finale, produite clé par clé ; les fichiers temporaires sont supprimés à la fin."""
+        if self.runs is None:
+            self.run()
+        phases = self.stats["phases"]
+        try:
+            if self.runs:
+                self.stats["passes"] += 1
+            merged = heapq.merge(*(self._open(r) for r in self.runs))
+            while True:
+                start = time.perf_counter()
+                batch = list(islice(merged, _WRITE_BATCH))
+                phases["merge"] = phases.get("merge", 0.0) + time.perf_counter() - start
+                if not batch:
+                    break
+                yield from batch
+        finally:
+            self.cleanup()
+
+    def cleanup(self):
+        if self.workdir is not None:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+            self.workdir = None
+
+
+def report(stats):
+    phases = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in stats["phases"].items())
+    return (f"{stats['n']} clés, {stats['runs']} séquences, {stats['passes']} passe(s) de fusion, "
+            f"{stats['bytes_written']} octets écrits, {stats['bytes_read']} octets relus ; {phases}")
+
+
+def main():
+    from ingest import guess_format, iter_values
+
+    parser = argparse.ArgumentParser(description="Tri externe par Treap d'un fichier CSV/NDJSON")
+    parser.add_argument("input", help="fichier d'entrée ('-' pour l'entrée standard)")
+    parser.add_argument("-o", "--output", help="fichier de sortie (sortie standard par défaut)")
+    parser.add_argument("--format", choices=["csv", "ndjson"])
+    parser.add_argument("--run-size", type=int, default=RUN_SIZE)
+    parser.add_argument("--fan-in", type=int, default=FAN_IN)
+    parser.add_argument("--priority-source", default="random")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--tmpdir")
+    args = parser.parse_args()
+
+    stream = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    out = open(args.output, "w") if args.output else sys.stdout
+    fmt = args.format or guess_format(args.input)
+    sorter = ExternalSort(iter_values(stream, fmt), args.run_size, args.fan_in,
+                          source=make_priority_source(args.priority_source, args.seed), tmpdir=args.tmpdir)
+    with stream, out:
+        try:
+            sorter.run()
+        except ValueError as e:
+            # Entrée invalide : signalée avant d'écrire la moindre clé
+            parser.error(str(e))
+        batch = []
+        for key in sorter:
+            batch.append(str(key))
+            if len(batch) >= _WRITE_BATCH:
+                out.write("\n".join(batch) + "\n")
+                batch = []
+        if batch:
+            out.write("\n".join(batch) + "\n")
+    print(report(sorter.stats), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#       INGESTION EN FLUX (CSV / NDJSON)
+
+# Les valeurs sont lues par morceaux de taille fixe et produites une à une :
+# la mémoire reste constante quelle que soit la taille de l'envoi, seule la
+# structure construite grossit.
+
+import codecs, json, math, re
+
+CHUNK_SIZE = 1 << 16
+_SEPARATORS = re.compile(r'[,;\s]+')
+
+
+def _chunks(stream, chunk_size):
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    while True:
+        data = stream.read(chunk_size)
+        if not data:
+            tail = decoder.decode(b'', final=True)
+            if tail:
+                yield tail
+            return
+        yield decoder.decode(data) if isinstance(data, bytes) else data
+
+
+def iter_csv(stream, chunk_size=CHUNK_SIZE):
+    """Entiers séparés par des virgules, points-virgules, espaces ou retours à la ligne."""
+    carry = ''
+    for chunk in _chunks(stream, chunk_size):
+        tokens = _SEPARATORS.split(carry + chunk)
+        # Le dernier morceau peut être coupé au milieu d'un nombre
+        carry = tokens.pop()
+        for token in tokens:
+            if token:
+                yield int(token)
+    if carry:
+        yield int(carry)
+
+
+def _number(v):
+    # Nombre fini ; un flottant entier (3.0) devient un int, comme la même clé lue en CSV
+    if isinstance(v, bool) or not isinstance(v, (int, float)):
+        return None
+    if isinstance(v, float):
+        if not math.isfinite(v):
+            return None
+        return int(v) if v.is_integer() else v
+    return v
+
+
+def _check(value, line_no):
+    """Valeur NDJSON validée avant usage : les clés de types mêlés (texte, null…) ne se comparent pas."""
+    if isinstance(value, list) and len(value) == 2:
+        key, priority = _number(value[0]), _number(value[1])
+        if key is not None and priority is not None:
+            return [key, priority]
+    else:
+        key = _number(value)
+        if key is not None:
+            return key
+    raise ValueError(f"Ligne {line_no} : un nombre ou une paire [clé, priorité] numérique est attendu, "
+                     f"reçu {json.dumps(value)[:40]}")
+
+
+def iter_ndjson(stream, chunk_size=CHUNK_SIZE):
+    """Une valeur JSON par ligne : un nombre, ou une liste [clé, priorité]."""
+    carry, line_no = '', 0
+    for chunk in _chunks(stream, chunk_size):
+        lines = (carry + chunk).split('\n')
+        carry = lines.pop()
+        for line in lines:
+            line_no += 1
+            if line.strip():
+                yield _check(json.loads(line), line_no)
+    if carry.strip():
+        yield _check(json.loads(carry), line_no + 1)
+
+
+def iter_values(stream, fmt='csv', chunk_size=CHUNK_SIZE):
+    if fmt == 'csv':
+        return iter_csv(stream, chunk_size)
+    if fmt == 'ndjson':
+        return iter_ndjson(stream, chunk_size)
+    raise ValueError("Format invalide : choisissez 'csv' ou 'ndjson'.")
+
+
+def guess_format(filename=None, mimetype=None):
+    """Format d'après l'extension du fichier ou le Content-Type ('csv' par défaut)."""
+    if filename and filename.rsplit('.', 1)[-1].lower() in ('ndjson', 'jsonl'):
+        return 'ndjson'
+    if mimetype in ('application/x-ndjson', 'application/jsonl', 'application/json'):
+        return 'ndjson'
+    return 'csv'
+
+
+def scalars_only(values):
+    """Laisse passer les nombres seuls ; une paire [clé, priorité] (NDJSON) lève ValueError."""
+    for i, v in enumerate(values, 1):
+        if isinstance(v, list):
+            raise ValueError(f"Valeur n°{i} : un nombre est attendu, pas une paire [clé, priorité]")
+        yield v
+
+
+class CountingIter:
+    """Compte les valeurs qui traversent un itérateur sans les conserver."""
+    def __init__(self, values):
+        self.values = values
+        self.n = 0
+
+    def __iter__(self):
+        for v in self.values:
+            self.n += 1
+            yield v
@@ -0,0 +1,205 @@
+#       MESURES : PHASES PAR REQUÊTE, HISTOGRAMMES, PROFILAGE
+
+# Chaque requête collecte la durée de ses phases (parse, build, algorithm,
+# layout, render, encode...) avec `with phase('build'):`. Les durées partent
+# dans des histogrammes par route, exposés au format texte de Prometheus sur
+# /metrics, et dans l'en-tête Server-Timing de la réponse. Le code exécuté
+# dans un processus de rendu renvoie ses phases avec `capture`, fusionnées
+# ensuite dans la requête d'origine. `?profile=1` renvoie le profil cProfile
+# de la requête au lieu de sa réponse (pour une vue asynchrone, le profil
+# couvre la coroutine ; le travail parti dans le pool n'apparaît que via ses
+# phases). Le profilage coûte cher et expose le code : il n'est actif qu'en
+# mode debug ou avec TP_PROFILING=1.
+
+import contextvars, cProfile, inspect, io, os, pstats, threading, time
+from contextlib import contextmanager
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_phases = contextvars.ContextVar('phases', default=None)
+
+
+@contextmanager
+def phase(name):
+    """Ajoute la durée du bloc à la phase `name` de la collecte en cours (s'il y en a une)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases = _phases.get()
+        if phases is not None:
+            phases[name] = phases.get(name, 0.0) + time.perf_counter() - start
+
+
+@contextmanager
+def collect(nested=True):
+    """Démarre une collecte de phases ; le dictionnaire est rempli au fil des blocs `phase`.
+
+    Avec `nested`, les durées sont aussi reportées dans la collecte englobante à la sortie."""
+    parent = _phases.get()
+    phases = {}
+    token = _phases.set(phases)
+    try:
+        yield phases
+    finally:
+        _phases.reset(token)
+        if nested and parent is not None:
+            merge(phases)
+
+
+def merge(phases):
+    current = _phases.get()
+    if current is not None:
+        for name, seconds in phases.items():
+            current[name] = current.get(name, 0.0) + seconds
+
+
+def capture(fn, *args):
+    """Exécute fn(*args) dans sa propre collecte ; renvoie (résultat, phases). Sérialisable."""
+    with collect(nested=False) as phases:
+        result = fn(*args)
+    return result, phases
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.families = {}
+        self.gauges = {}
+        self.counters = {}
+
+    def observe(self, name, labels, value):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            family = self.families.setdefault(name, {})
+            family.setdefault(key, Histogram()).observe(value)
+
+    def gauge(self, name, read):
+        """Valeur lue au moment de l'export (ex. rendus en attente)."""
+        self.gauges[name] = read
+
+    def counter(self, name, read):
+        """Total croissant lu au moment de l'export (ex. rendus partagés depuis le lancement)."""
+        self.counters[name] = read
+
+    def render(self, help_texts):
+        lines = []
+        with self._lock:
+            for name, family in sorted(self.families.items()):
+                lines.append(f"# HELP {name} {help_texts.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, hist in sorted(family.items()):
+                    labels = ','.join(f'{k}="{v}"' for k, v in key)
+                    cumulative = 0
+                    for bound, count in zip((*BUCKETS, '+Inf'), hist.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                    lines.append(f"{name}_sum{{{labels}}} {hist.sum:.6f}")
+                    lines.append(f"{name}_count{{{labels}}} {hist.count}")
+        for kind, reads in (('gauge', self.gauges), ('counter', self.counters)):
+            for name, read in sorted(reads.items()):
+                lines.append(f"# HELP {name} {help_texts.get(name, name)}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name} {read()}")
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+HELP = {
+    'tp_request_duration_seconds': "Durée totale des requêtes par route",
+    'tp_phase_duration_seconds': "Durée des phases (parse, build, algorithm, layout, render, encode) par route",
+    'tp_render_pending': "Rendus en cours ou en attente dans le pool",
+    'tp_render_queued': "Rendus en attente d'un processus libre",
+    'tp_render_coalesced_total': "Demandes servies par un rendu identique déjà en cours",
+}
+
+
+def init_app(app):
+    """Branche la collecte des phases, les histogrammes, ?profile=1 et /metrics sur l'application."""
+    from flask import Response, g, request
+
+    app.config.setdefault('TP_PROFILING', os.environ.get('TP_PROFILING') == '1')
+
+    ensure_sync = app.ensure_sync
+
+    def profiled_ensure_sync(func):
+        # Une vue asynchrone tourne dans le thread de sa boucle : le profileur y est activé
+        if not inspect.iscoroutinefunction(func):
+            return ensure_sync(func)
+
+        async def run(*args, **kwargs):
+            profiler = g.get('profiler')
+            if profiler is None:
+                return await func(*args, **kwargs)
+            profiler.enable()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                profiler.disable()
+        return ensure_sync(run)
+
+    app.ensure_sync = profiled_ensure_sync
+
+    @app.before_request
+    def _start():
+        g.metrics_start = time.perf_counter()
+        g.metrics_phases = {}
+        g.metrics_token = _phases.set(g.metrics_phases)
+        if request.args.get('profile') == '1' and (app.debug or app.config['TP_PROFILING']):
+            g.profiler = cProfile.Profile()
+            view = app.view_functions.get(request.endpoint)
+            if not inspect.iscoroutinefunction(view):
+                g.profiler.enable()
+
+    @app.after_request
+    def _finish(response):
+        if 'metrics_start' not in g:
+            return response
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.disable()
+        elapsed = time.perf_counter() - g.metrics_start
+        route = request.url_rule.rule if request.url_rule else '<unmatched>'
+        registry.observe('tp_request_duration_seconds',
+                         {'route': route, 'method': request.method, 'status': response.status_code}, elapsed)
+        for name, seconds in g.metrics_phases.items():
+            registry.observe('tp_phase_duration_seconds', {'route': route, 'phase': name}, seconds)
+        timings = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in g.metrics_phases.items()]
+        response.headers['Server-Timing'] = ', '.join(timings + [f"total;dur={elapsed * 1000:.2f}"])
+        if profiler is not None:
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(40)
+            return Response(out.getvalue(), mimetype='text/plain')
+        return response
+
+    @app.teardown_request
+    def _reset(exc):
+        token = g.pop('metrics_token', None)
+        if token is not None:
+            try:
+                _phases.reset(token)
+            except ValueError:
+                # Jeton créé dans un autre contexte (vue asynchrone) : rien à restaurer
+                pass
+
+    @app.route('/metrics')
+    def metrics_endpoint():
+        return Response(registry.render(HELP), mimetype='text/plain; version=0.0.4')
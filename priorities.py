@@ -0,0 +1,95 @@
+#       SOURCES DE PRIORITÉS POUR LA CONSTRUCTION DES TREAPS
+
+# Une source produit les priorités d'un lot de clés en un seul appel.
+# Toutes sont déterministes pour une graine donnée, ce qui permet de
+# rejouer exactement une construction, et tirent leurs valeurs dans
+# l'intervalle ouvert ]0, 1[ exigé par Treap.insert.
+
+import hashlib, importlib.util, random
+
+BATCH_SIZE = 4096
+_BITS = 52
+_SCALE = float(1 << _BITS)
+
+
+def _to_unit(x):
+    # Entier de 52 bits -> ]0, 1[ : (x + 0.5) / 2^52 n'atteint jamais 0 ni 1
+    return (x + 0.5) / _SCALE
+
+
+class RandomPriorities:
+    """Générateur pseudo-aléatoire propre à l'arbre (pas le RNG global)."""
+    kind = "random"
+    requires = None
+
+    def __init__(self, seed=None):
+        self.seed = seed
+        self._rng = random.Random(seed)
+
+    def batch(self, keys):
+        bits = self._rng.getrandbits
+        return [_to_unit(bits(_BITS)) for _ in keys]
+
+
+class NumpyPriorities:
+    """Génération vectorisée : n priorités en un seul appel NumPy."""
+    kind = "numpy"
+    requires = "numpy"
+
+    def __init__(self, seed=None):
+        try:
+            import numpy as np
+        except ImportError:
+            raise ValueError("La source 'numpy' nécessite le paquet numpy.")
+        self.seed = seed
+        self._rng = np.random.default_rng(seed)
+
+    def batch(self, keys):
+        raw = self._rng.integers(0, 1 << _BITS, size=len(keys), dtype='int64')
+        return ((raw + 0.5) / _SCALE).tolist()
+
+
+class HashPriorities:
+    """priorité = hash(clé, graine) : même clé, même graine -> même priorité, quel que soit l'ordre."""
+    kind = "hash"
+    requires = None
+
+    def __init__(self, seed=None):
+        self.seed = 0 if seed is None else seed
+        self._salt = str(self.seed).encode()
+
+    def batch(self, keys):
+        result = []
+        for key in keys:
+            digest = hashlib.blake2b(repr(key).encode(), digest_size=8, key=self._salt).digest()
+            result.append(_to_unit(int.from_bytes(digest, 'big') >> (64 - _BITS)))
+        return result
+
+
+SOURCES = {cls.kind: cls for cls in (RandomPriorities, NumpyPriorities, HashPriorities)}
+
+
+def available_sources():
+    """Sources utilisables ici : celles dont le paquet requis est installé."""
+    return [kind for kind, cls in SOURCES.items()
+            if cls.requires is None or importlib.util.find_spec(cls.requires) is not None]
+
+
+def make_priority_source(kind="random", seed=None):
+    choices = available_sources()
+    if kind not in choices:
+        reason = "indisponible" if kind in SOURCES else "inconnue"
+        raise ValueError(f"Source de priorités {reason} : {kind} (choix : {', '.join(choices)})")
+    return SOURCES[kind](seed)
+
+
+def with_priorities(keys, source, batch_size=BATCH_SIZE):
+    """Associe une priorité à chaque clé d'un flux, lot par lot : paires (clé, priorité)."""
+    batch = []
+    for key in keys:
+        batch.append(key)
+        if len(batch) >= batch_size:
+            yield from zip(batch, source.batch(batch))
+            batch = []
+    if batch:
+        yield from zip(batch, source.batch(batch))
@@ -0,0 +1,218 @@
+#       SERVICE DE RENDU (travail CPU hors de la boucle de requêtes)
+
+# Les rendus matplotlib et les constructions d'arbres lourdes partent dans un
+# pool de processus de longue durée, dont matplotlib est chargé dès le
+# démarrage. Les tâches attendent dans une file à priorités (TP2 interactif
+# avant TP1, avant les étapes de TP3) et ne sont confiées aux processus qu'au
+# fur et à mesure qu'ils se libèrent. Deux demandes simultanées de même clé
+# partagent un seul rendu. Une tâche encore en file que plus personne
+# n'attend (délai dépassé, client parti) est abandonnée sans être rendue.
+# Quand la file est pleine, `Overloaded` est levée (réponse 503) ; un rendu
+# trop long lève `RenderTimeout` (réponse 504).
+#
+#   TP_RENDER_WORKERS  nombre de processus (0 = exécution dans le thread appelant)
+#   TP_RENDER_QUEUE    nombre maximal de tâches distinctes en cours ou en attente
+#   TP_RENDER_TIMEOUT  délai maximal d'attente d'un résultat, en secondes
+
+import asyncio, heapq, itertools, multiprocessing, os, threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import metrics
+
+# Priorités : la plus petite valeur passe en premier
+INTERACTIVE, NORMAL, BATCH = 0, 1, 2
+
+
+class Overloaded(Exception):
+    """La file du pool de rendu est pleine."""
+
+
+class RenderTimeout(Exception):
+    """Le résultat d'un rendu n'est pas arrivé dans le délai `timeout`."""
+
+
+def _warm_worker():
+    # Initialisation de chaque processus : matplotlib et networkx prêts avant le premier rendu
+    from rendering import networkx, pyplot
+    networkx()
+    pyplot()
+
+
+def _noop():
+    return None
+
+
+class _Job:
+    __slots__ = ('fn', 'args', 'key', 'future', 'waiters', 'started')
+
+    def __init__(self, fn, args, key):
+        self.fn = fn
+        self.args = args
+        self.key = key
+        self.future = Future()
+        self.waiters = 0
+        self.started = False
+
+
+class RenderPool:
+    def __init__(self, workers=None, max_pending=None, timeout=None):
+        if workers is None:
+            workers = int(os.environ.get('TP_RENDER_WORKERS', min(4, os.cpu_count() or 1)))
+        if max_pending is None:
+            max_pending = int(os.environ.get('TP_RENDER_QUEUE', 4 * max(workers, 1)))
+        if timeout is None:
+            timeout = float(os.environ.get('TP_RENDER_TIMEOUT', 30))
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.pending = 0
+        self.running = 0
+        self.coalesced = 0
+        self._queue = []
+        self._inflight = {}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self):
+        # Créé au premier rendu ; 'spawn' évite de forker un serveur multithreadé
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context('spawn'),
+                                                 initializer=_warm_worker)
+        return self._executor
+
+    def warm(self):
+        """Démarre tous les processus tout de suite, au lieu du premier rendu."""
+        if self.workers > 0:
+            executor = self._get_executor()
+            for future in [executor.submit(_noop) for _ in range(self.workers)]:
+                future.result()
+
+    @property
+    def queued(self):
+        return self.pending - self.running
+
+    def _enqueue(self, fn, args, key, priority):
+        """Tâche de clé `key` déjà en cours, ou nouvelle tâche mise en file ; lève Overloaded si la file est pleine."""
+        with self._lock:
+            job = self._inflight.get(key) if key is not None else None
+            inline = False
+            if job is not None:
+                self.coalesced += 1
+            else:
+                if self.pending >= self.max_pending:
+                    raise Overloaded(f"{self.pending} rendus en attente")
+                self.pending += 1
+                job = _Job(fn, args, key)
+                if key is not None:
+                    self._inflight[key] = job
+                if self.workers > 0:
+                    heapq.heappush(self._queue, (priority, next(self._seq), job))
+                else:
+                    job.started = inline = True
+            job.waiters += 1
+        if inline:
+            self._run_inline(job)
+        elif self.workers > 0:
+            self._dispatch()
+        return job
+
+    def _run_inline(self, job):
+        try:
+            result = job.fn(*job.args)
+        except Exception as e:
+            self._finish(job, None, e)
+        else:
+            self._finish(job, result, None)
+
+    def _dispatch(self):
+        """Confie les tâches les plus prioritaires aux processus libres."""
+        while True:
+            with self._lock:
+                if self.running >= self.workers or not self._queue:
+                    return
+                job = heapq.heappop(self._queue)[2]
+                if job.future.cancelled():
+                    continue
+                job.started = True
+                self.running += 1
+            try:
+                future = self._get_executor().submit(job.fn, *job.args)
+            except Exception as e:
+                with self._lock:
+                    self.running -= 1
+                self._finish(job, None, e)
+                continue
+            future.add_done_callback(lambda f, job=job: self._completed(job, f))
+
+    def _completed(self, job, future):
+        with self._lock:
+            self.running -= 1
+        if future.cancelled():
+            with self._lock:
+                self._release(job)
+            job.future.cancel()
+            return
+        error = future.exception()
+        if isinstance(error, BrokenProcessPool):
+            # Un processus est mort : un nouveau pool sera créé pour les tâches suivantes
+            self._executor = None
+        self._finish(job, None if error else future.result(), error)
+        self._dispatch()
+
+    def _release(self, job):
+        # Appelé sous le verrou : la tâche quitte le compte et n'est plus partageable
+        self.pending -= 1
+        if job.key is not None and self._inflight.get(job.key) is job:
+            del self._inflight[job.key]
+
+    def _finish(self, job, result, error):
+        with self._lock:
+            self._release(job)
+        if error is not None:
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(result)
+
+    def _abandon(self, job):
+        """Un demandeur n'attend plus : la tâche est retirée si elle n'a pas encore commencé."""
+        with self._lock:
+            job.waiters -= 1
+            if job.waiters == 0 and not job.started and job.future.cancel():
+                self._release(job)
+
+    def submit(self, fn, *args, key=None, priority=NORMAL):
+        """Soumet fn(*args) et renvoie un Future ; une tâche de même `key` déjà en cours est partagée."""
+        return self._enqueue(fn, args, key, priority).future
+
+    async def run(self, fn, *args, key=None, priority=NORMAL):
+        """Attend le résultat de fn(*args) sans bloquer la boucle ; RenderTimeout après `timeout`.
+
+        Les phases mesurées dans le processus de rendu sont reportées dans la requête appelante.
+        Si l'attente est annulée ou expire, la tâche est abandonnée tant qu'elle n'a pas démarré."""
+        job = self._enqueue(metrics.capture, (fn, *args), key, priority)
+        try:
+            # shield : annuler une attente ne doit pas annuler le rendu partagé avec d'autres demandeurs
+            result, phases = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(job.future)),
+                                                    self.timeout)
+        except asyncio.CancelledError:
+            self._abandon(job)
+            raise
+        except asyncio.TimeoutError:
+            self._abandon(job)
+            raise RenderTimeout(f"rendu non terminé après {self.timeout:g} s") from None
+        metrics.merge(phases)
+        return result
+
+    def shutdown(self):
+        with self._lock:
+            queued, self._queue = self._queue, []
+            # Une tâche en file n'a pas démarré ; celles déjà abandonnées ont rendu leur place
+            for _, _, job in queued:
+                if not job.future.cancelled() and job.future.cancel():
+                    self._release(job)
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
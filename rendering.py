@@ -0,0 +1,293 @@
+#       RENDU MATPLOTLIB (chargé à la demande)
+
+# matplotlib et networkx ne sont importés qu'au premier rendu : les structures
+# de données et les routes JSON démarrent sans ces bibliothèques.
+
+import io, base64
+from collections import deque
+
+from metrics import phase
+from tree_json import node_children
+
+_pyplot = None
+
+
+def pyplot():
+    """matplotlib.pyplot avec le backend Agg, importé au premier appel."""
+    global _pyplot
+    if _pyplot is None:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        _pyplot = plt
+    return _pyplot
+
+
+def networkx():
+    import networkx as nx
+    return nx
+
+
+#   Position hiérarchique
+
+def hierarchy_pos(G, root=None, width=1., vert_gap=0.2, vert_loc=0, xcenter=0.5):
+    nx = networkx()
+    if not nx.is_tree(G):
+        return nx.spring_layout(G)
+    if root is None:
+        root = next(iter(G.nodes))
+    def _hierarchy_pos(G, root, width=1., vert_gap=0.2, vert_loc=0, xcenter=0.5,
+                       pos=None, parent=None, parsed=None):
+        if pos is None:
+            pos = {root: (xcenter, vert_loc)}
+        if parsed is None:
+            parsed = set()
+        parsed.add(root)
+        neighbors = [n for n in G.neighbors(root) if n != parent]
+        if len(neighbors) != 0:
+            dx = width / len(neighbors)
+            nextx = xcenter - width/2 - dx/2
+            for neighbor in neighbors:
+                nextx += dx
+                pos[neighbor] = (nextx, vert_loc - vert_gap)
+                pos = _hierarchy_pos(G, neighbor, width=dx, vert_gap=vert_gap,
+                                     vert_loc=vert_loc - vert_gap, xcenter=nextx,
+                                     pos=pos, parent=root, parsed=parsed)
+        return pos
+    return _hierarchy_pos(G, root, width, vert_gap, vert_loc, xcenter)
+
+
+#   Dessin graphe / arbre
+
+def graphe_to_image(G, figsize=(8, 6), title=None, fmt='png'):
+    nx, plt = networkx(), pyplot()
+    with phase('layout'):
+        try:
+            if nx.is_tree(G):
+                root = next(iter(G.nodes))
+                pos = hierarchy_pos(G, root=root, width=1.0, vert_gap=0.18, vert_loc=1.0, xcenter=0.5)
+            else:
+                pos = nx.spring_layout(G)
+        except Exception:
+            pos = nx.spring_layout(G)
+
+    with phase('render'):
+        _draw(G, pos, figsize, title)
+
+    with phase('encode'):
+        buf = io.BytesIO()
+        plt.savefig(buf, format=fmt, bbox_inches='tight', dpi=150)
+        plt.close()
+    return buf.getvalue()
+
+def _draw(G, pos, figsize, title):
+    nx, plt = networkx(), pyplot()
+    plt.figure(figsize=figsize)
+    # Nœuds plus petits quand le graphe est grand ; les résumés de sous-arbres en carrés gris
+    n = G.number_of_nodes()
+    node_size = 700 if n <= 60 else max(150, 42000 // n)
+    resumes = {v for v, resume in G.nodes(data='resume') if resume}
+    nx.draw_networkx_nodes(G, pos, nodelist=[v for v in G if v not in resumes], node_size=node_size,
+                           node_color='white', edgecolors='black', linewidths=1)
+    if resumes:
+        nx.draw_networkx_nodes(G, pos, nodelist=list(resumes), node_size=node_size * 2, node_shape='s',
+                               node_color='#e0e0e0', edgecolors='gray', linewidths=1)
+    nx.draw_networkx_labels(G, pos, labels=nx.get_node_attributes(G, 'label') or None,
+                            font_size=10 if n <= 60 else 6)
+    nx.draw_networkx_edges(G, pos)
+
+    if nx.is_weighted(G):
+        labels = nx.get_edge_attributes(G, 'weight')
+        nx.draw_networkx_edge_labels(G, pos, edge_labels=labels, font_size=8)
+
+    if title:
+        plt.title(title)
+    plt.axis('off')
+    plt.tight_layout()
+
+def graphe_to_base64(G, figsize=(8, 6), title=None):
+    image = graphe_to_image(G, figsize, title)
+    with phase('encode'):
+        return base64.b64encode(image).decode('ascii')
+
+
+#   Niveau de détail (grands arbres)
+
+LOD_BUDGET = 127
+
+
+def node_key(node):
+    """Clé(s) d'un nœud : clé d'un Treap, valeur d'un ABR/AVL/AMR, liste de clés d'un B-arbre."""
+    if hasattr(node, 'keys'):
+        return node.keys
+    return node.key if hasattr(node, 'key') else node.val
+
+
+def default_label(node):
+    key = node_key(node)
+    return ','.join(map(str, key)) if isinstance(key, list) else str(key)
+
+
+def find_node(root, key):
+    """Nœud de clé `key` : descente d'ABR pour les arbres binaires, parcours en largeur sinon."""
+    if not hasattr(root, 'children'):
+        node = root
+        while node is not None and node_key(node) != key:
+            node = node.left if key < node_key(node) else node.right
+        return node
+    queue = deque([root])
+    while queue:
+        node = queue.popleft()
+        k = node_key(node)
+        if k == key or (isinstance(k, list) and key in k):
+            return node
+        queue.extend(node_children(node))
+    return None
+
+
+def _key_range(node):
+    key = node_key(node)
+    return (key[0], key[-1]) if isinstance(key, list) else (key, key)
+
+
+def subtree_summary(root):
+    """Taille, hauteur et intervalle de clés d'un sous-arbre.
+
+    Taille et hauteur sont lues sur les nœuds (Treap et arbres TP1 les tiennent à
+    jour) ; dans un arbre de recherche, les bornes sont aux extrémités gauche et
+    droite : le coût est la hauteur, pas la taille. Seuls les arbres non ordonnés
+    (AMR) ou sans statistiques sont parcourus en entier. Un nœud qui fournit son
+    propre `summary()` (tas implicite, forêt) est interrogé directement."""
+    if hasattr(root, 'summary'):
+        return root.summary()
+    if not hasattr(root, 'size'):
+        return _walk_summary(root)
+    if hasattr(root, 'left'):
+        node = root
+        while node.left is not None:
+            node = node.left
+        lo = node_key(node)
+        node = root
+        while node.right is not None:
+            node = node.right
+        return root.size, root.height, lo, node_key(node)
+    if hasattr(root, 'keys'):
+        # B-arbre : clés triées dans chaque nœud, premier et dernier enfants aux extrémités
+        node = root
+        while node.children:
+            node = node.children[0]
+        lo = _key_range(node)[0]
+        node = root
+        while node.children:
+            node = node.children[-1]
+        return root.size, root.height, lo, _key_range(node)[1]
+    return _walk_summary(root)
+
+
+def _walk_summary(root):
+    """Résumé par parcours itératif complet, pour les sous-arbres sans ordre ni cache."""
+    size, height, lo, hi = 0, 0, None, None
+    stack = [(root, 1)]
+    while stack:
+        node, depth = stack.pop()
+        size += 1
+        height = max(height, depth)
+        key = node_key(node)
+        for k in (key if isinstance(key, list) else [key]):
+            lo = k if lo is None or k < lo else lo
+            hi = k if hi is None or k > hi else hi
+        stack.extend((c, depth + 1) for c in node_children(node) if c is not None)
+    return size, height, lo, hi
+
+
+def lod_graph(root, max_depth=None, node_budget=LOD_BUDGET, focus=None, label=default_label):
+    """Graphe de rendu d'au plus `node_budget` nœuds.
+
+    Les niveaux supérieurs sont développés en largeur d'abord ; un nœud dont les
+    enfants dépassent `max_depth` ou le budget devient un résumé de son
+    sous-arbre (taille, hauteur, intervalle de clés). `focus` recentre le rendu
+    sur le sous-arbre de cette clé. Retourne None si `focus` est introuvable."""
+    nx = networkx()
+    if focus is not None:
+        root = find_node(root, focus)
+    if root is None:
+        return None
+    G = nx.DiGraph()
+    G.add_node(id(root), label=label(root))
+    count = 1
+    queue = deque([(root, 0)])
+    while queue:
+        node, depth = queue.popleft()
+        kids = [c for c in node_children(node) if c is not None]
+        if not kids:
+            continue
+        if (max_depth is None or depth + 1 < max_depth) and count + len(kids) <= node_budget:
+            for child in kids:
+                G.add_node(id(child), label=label(child))
+                G.add_edge(id(node), id(child))
+                queue.append((child, depth + 1))
+            count += len(kids)
+        else:
+            size, height, lo, hi = subtree_summary(node)
+            G.nodes[id(node)].update(resume=True,
+                                     label=f"{label(node)}\n+{size - 1} nœuds, h={height}\n[{_bound(lo)}..{_bound(hi)}]")
+    return G
+
+
+def _bound(key):
+    return '' if key is None else key
+
+
+class HeapNode:
+    """Nœud d'un tas binaire stocké en tableau (enfants de i en 2i+1, 2i+2).
+
+    Les nœuds sont créés à la demande et conservés dans `nodes`, afin que leur
+    identité reste stable pendant la construction du graphe."""
+    __slots__ = ('heap', 'i', 'kind', 'nodes')
+
+    def __init__(self, heap, i=0, kind='min', nodes=None):
+        self.heap, self.i, self.kind = heap, i, kind
+        self.nodes = {} if nodes is None else nodes
+        self.nodes[i] = self
+
+    @property
+    def val(self):
+        return self.heap[self.i]
+
+    @property
+    def children(self):
+        n = len(self.heap)
+        return [self.nodes.get(j) or HeapNode(self.heap, j, self.kind, self.nodes)
+                for j in (2 * self.i + 1, 2 * self.i + 2) if j < n]
+
+    def summary(self):
+        """Taille et hauteur tirées des indices, niveau par niveau : O(log n).
+        Seule la borne portée par la racine du sous-tas est connue sans parcours."""
+        n, size, height = len(self.heap), 0, 0
+        lo = hi = self.i
+        while lo < n:
+            size += min(hi, n - 1) - lo + 1
+            height += 1
+            lo, hi = 2 * lo + 1, 2 * hi + 2
+        if self.kind == 'max':
+            return size, height, None, self.val
+        return size, height, self.val, None
+
+
+class ForestRoot:
+    """Racine virtuelle reliant les arbres d'une forêt (AMR) ; son résumé est
+    calculé une fois à la création, le rendu reste borné par le budget."""
+    __slots__ = ('val', 'children', '_summary')
+
+    def __init__(self, roots, val='AMR'):
+        self.val, self.children = val, list(roots)
+        size, height, lo, hi = 1, 1, None, None
+        for root in self.children:
+            s, h, l, r = subtree_summary(root)
+            size, height = size + s, max(height, h + 1)
+            lo = l if lo is None or l < lo else lo
+            hi = r if hi is None or r > hi else hi
+        self._summary = (size, height, lo, hi)
+
+    def summary(self):
+        return self._summary
@@ -1,5 +1,148 @@
 let currentTreeId = null;
 let currentHeapType = null;
+let treeModel = null;
+let treeStream = null;
+
+// ==========================
+//       CLIENT-SIDE MODEL
+// ==========================
+// Copie locale de la structure, tenue à jour par les deltas du flux SSE :
+// chaque opération ne coûte que le chemin modifié, sans retélécharger l'arbre.
+function emptyModel(seq) {
+  return { root: null, size: 0, seq: seq || 0 };
+}
+
+function modelInsertLeaf(model, key, priority) {
+  const node = { key, priority, left: null, right: null };
+  model.size += 1;
+  if (!model.root) {
+    model.root = node;
+    return;
+  }
+  let current = model.root;
+  while (true) {
+    const side = key < current.key ? "left" : "right";
+    if (!current[side]) {
+      current[side] = node;
+      return;
+    }
+    current = current[side];
+  }
+}
+
+function modelLocate(model, key) {
+  let parent = null;
+  let side = null;
+  let node = model.root;
+  while (node && node.key !== key) {
+    parent = node;
+    side = key < node.key ? "left" : "right";
+    node = node[side];
+  }
+  return { node, parent, side };
+}
+
+function modelReplace(model, parent, side, node) {
+  if (parent) {
+    parent[side] = node;
+  } else {
+    model.root = node;
+  }
+}
+
+function modelRotate(model, dir, key) {
+  const { node, parent, side } = modelLocate(model, key);
+  if (!node) return;
+  let top;
+  if (dir === "right") {
+    top = node.left;
+    node.left = top.right;
+    top.right = node;
+  } else {
+    top = node.right;
+    node.right = top.left;
+    top.left = node;
+  }
+  modelReplace(model, parent, side, top);
+}
+
+function modelRemove(model, key) {
+  const { node, parent, side } = modelLocate(model, key);
+  if (!node) return;
+  modelReplace(model, parent, side, node.left || node.right);
+  model.size -= 1;
+}
+
+function modelFromPreorder(preorder, seq) {
+  // Réinsérer le parcours préfixe dans un ABR redonne exactement la même forme
+  const model = emptyModel(seq);
+  preorder.forEach(([key, priority]) => modelInsertLeaf(model, key, priority));
+  return model;
+}
+
+function modelHeight(model) {
+  let height = 0;
+  let level = model.root ? [model.root] : [];
+  while (level.length) {
+    height += 1;
+    level = level.flatMap((n) => [n.left, n.right]).filter(Boolean);
+  }
+  return height;
+}
+
+// ==========================
+//       DELTA STREAM
+// ==========================
+function openStream() {
+  if (treeStream) treeStream.close();
+  treeStream = new EventSource(`/tp2/stream/${currentTreeId}?since=${treeModel.seq}`);
+  treeStream.onmessage = (event) => applyDelta(JSON.parse(event.data));
+  treeStream.addEventListener("gone", () => treeStream.close());
+}
+
+function applyDelta(delta) {
+  if (!treeModel) return;
+  // Un chargement en masse ne détaille pas ses clés : on recharge l'arbre complet
+  if (delta.type === "reset" || delta.type === "bulk" || delta.seq > treeModel.seq + 1) {
+    refreshVisualization();
+    return;
+  }
+  if (delta.seq <= treeModel.seq) return;
+
+  treeModel.seq = delta.seq;
+  if (delta.changed && delta.type === "insert") {
+    modelInsertLeaf(treeModel, delta.key, delta.priority);
+    delta.rotations.forEach((r) => modelRotate(treeModel, r.dir, r.key));
+  } else if (delta.changed && delta.type === "delete") {
+    delta.rotations.forEach((r) => modelRotate(treeModel, r.dir, r.key));
+    modelRemove(treeModel, delta.key);
+  } else if (delta.changed && delta.type === "clear") {
+    treeModel = emptyModel(delta.seq);
+  }
+
+  prependOperation(delta.type, delta.message);
+  renderModel();
+}
+
+function renderModel() {
+  document.getElementById("stat-nodes").textContent = treeModel.size;
+  document.getElementById("stat-height").textContent = modelHeight(treeModel);
+
+  const svg = document.getElementById("tree-svg");
+  if (treeModel.size > 0) {
+    renderTree(
+      svg,
+      [treeModel.root],
+      (n) => (n.left || n.right ? [n.left, n.right] : []),
+      (n) => [String(n.key), Number(n.priority).toFixed(2)]
+    );
+    svg.style.display = "block";
+    document.getElementById("empty-state").style.display = "none";
+  } else {
+    svg.style.display = "none";
+    document.getElementById("empty-state").style.display = "block";
+  }
+}
 
 // ==========================
 //       CREATE TREE
@@ -33,7 +176,10 @@ async function createTree(heapType) {
       badge.className = `badge ${heapType.toLowerCase()}`;
 
       showMessage(`Arbre ${heapType} Heap créé avec succès!`, "success");
-      refreshVisualization();
+      treeModel = emptyModel();
+      updateOperationsList([]);
+      renderModel();
+      openStream();
     }
   } catch (error) {
     showMessage("Erreur lors de la création de l'arbre", "error");
@@ -73,7 +219,6 @@ async function insertNode() {
       showMessage(data.message || "Nœud inséré avec succès", "success");
       document.getElementById("insert-key").value = "";
       document.getElementById("insert-priority").value = "";
-      refreshVisualization();
     } else {
       showMessage(data.error || "Erreur lors de l'insertion", "error");
     }
@@ -156,7 +301,6 @@ async function deleteNode() {
     if (data.success) {
       showMessage(data.message || "Nœud supprimé avec succès", "success");
       document.getElementById("delete-key").value = "";
-      refreshVisualization();
     } else {
       showMessage(data.error || "Erreur lors de la suppression", "error");
     }
@@ -173,7 +317,7 @@ async function refreshVisualization() {
   if (!currentTreeId) return;
 
   try {
-    const response = await fetch(`/tp2/tree_data/${currentTreeId}`);
+    const response = await fetch(`/tp2/tree_data/${currentTreeId}?structure=1`);
     if (!response.ok) {
       const text = await response.text();
       console.error("Erreur HTTP:", response.status, text);
@@ -181,51 +325,17 @@ async function refreshVisualization() {
     }
 
     const data = await response.json();
-    const treeData = data.data || { size: 0, height: 0, operations: [] };
-
-    document.getElementById("stat-nodes").textContent = treeData.size || 0;
-    document.getElementById("stat-height").textContent = treeData.height || 0;
+    const treeData = data.data || { version: 0, seq: 0, preorder: [], operations: [] };
 
+    treeModel = modelFromPreorder(treeData.preorder || [], treeData.seq);
     updateOperationsList(treeData.operations || []);
-
-    if (treeData.size > 0) {
-      loadVisualization();
-    } else {
-      document.getElementById("tree-image").style.display = "none";
-      document.getElementById("empty-state").style.display = "block";
-    }
+    renderModel();
+    openStream();
   } catch (error) {
     console.error("Erreur lors du rafraîchissement", error);
   }
 }
 
-// ==========================
-//       LOAD VISUALIZATION
-// ==========================
-async function loadVisualization() {
-  if (!currentTreeId) return;
-
-  try {
-    const response = await fetch(`/tp2/visualization/${currentTreeId}`);
-    if (!response.ok) {
-      const text = await response.text();
-      console.error("Erreur HTTP:", response.status, text);
-      return;
-    }
-
-    const data = await response.json();
-
-    if (data.success) {
-      const img = document.getElementById("tree-image");
-      img.src = "data:image/png;base64," + data.image;  // Correction ici
-      img.style.display = "block";
-      document.getElementById("empty-state").style.display = "none";
-    }
-  } catch (error) {
-    console.error("Erreur lors du chargement de la visualisation", error);
-  }
-}
-
 // ==========================
 //       UPDATE OPERATIONS LIST
 // ==========================
@@ -233,22 +343,20 @@ function updateOperationsList(operations) {
   const list = document.getElementById("operations-list");
   list.innerHTML = "";
 
-  operations.reverse().forEach((op) => {
-    const item = document.createElement("div");
-    item.className = `operation-item ${op.type}`;
-
-    let text = "";
-    if (op.type === "insert") {
-      text = `➕ Inséré: clé=${op.key}, priorité=${op.priority}`;
-    } else if (op.type === "delete") {
-      text = `➖ Supprimé: clé=${op.key}`;
-    } else if (op.type === "search") {
-      text = `🔍 Recherche: clé=${op.key} ${op.found ? "✓" : "✗"}`;
-    }
+  operations.forEach((op) => prependOperation(operationType(op), op));
+}
+
+function operationType(message) {
+  if (message.includes("Insertion")) return "insert";
+  if (message.includes("Suppression")) return "delete";
+  return "search";
+}
 
-    item.textContent = text;
-    list.appendChild(item);
-  });
+function prependOperation(type, message) {
+  const item = document.createElement("div");
+  item.className = `operation-item ${type}`;
+  item.textContent = message;
+  document.getElementById("operations-list").prepend(item);
 }
 
 // ==========================
@@ -271,7 +379,10 @@ function resetTree() {
   if (confirm("Êtes-vous sûr de vouloir réinitialiser l'arbre?")) {
     document.getElementById("welcome-screen").style.display = "flex";
     document.getElementById("main-screen").style.display = "none";
+    if (treeStream) treeStream.close();
     currentTreeId = null;
     currentHeapType = null;
+    treeModel = null;
+    treeStream = null;
   }
 }
\ No newline at end of file
@@ -0,0 +1,95 @@
+// ==========================
+//   DESSIN D'ARBRE CÔTÉ CLIENT (SVG)
+// ==========================
+// Mise en page et dessin dans le navigateur : TP2 redessine son modèle local
+// (tenu à jour par les deltas) sans redemander d'image au serveur.
+const SVG_NS = "http://www.w3.org/2000/svg";
+const NODE_RADIUS = 18;
+const X_STEP = 46;
+const Y_STEP = 70;
+
+// Feuilles espacées de gauche à droite (parcours postfixe itératif),
+// chaque parent centré au-dessus de ses enfants, y = profondeur.
+function layoutTree(roots, childrenOf) {
+  const placed = [];
+  let nextX = 0;
+  const stack = roots
+    .filter(Boolean)
+    .reverse()
+    .map((node) => ({ node, depth: 0, parent: null, kids: null }));
+
+  while (stack.length) {
+    const frame = stack[stack.length - 1];
+    if (frame.gap) {
+      stack.pop();
+      frame.x = nextX;
+      nextX += 0.5;
+      continue;
+    }
+    if (frame.kids === null) {
+      frame.kids = childrenOf(frame.node).map((child) =>
+        child ? { node: child, depth: frame.depth + 1, parent: frame, kids: null } : null
+      );
+      // Un fils absent d'un arbre binaire garde sa place pour distinguer gauche et droite
+      const hasSibling = frame.kids.some(Boolean);
+      frame.kids.forEach((kid, i) => {
+        if (!kid && hasSibling) frame.kids[i] = { gap: true };
+      });
+      for (let i = frame.kids.length - 1; i >= 0; i--) {
+        stack.push(frame.kids[i]);
+      }
+      continue;
+    }
+    stack.pop();
+    if (frame.kids.length) {
+      frame.x = (frame.kids[0].x + frame.kids[frame.kids.length - 1].x) / 2;
+    } else {
+      frame.x = nextX;
+      nextX += 1;
+    }
+    placed.push(frame);
+  }
+  return placed;
+}
+
+function svgElement(name, attrs) {
+  const el = document.createElementNS(SVG_NS, name);
+  Object.entries(attrs).forEach(([k, v]) => el.setAttribute(k, v));
+  return el;
+}
+
+// labelOf(node) renvoie une ou deux lignes de texte (ex. clé et priorité)
+function renderTree(svg, roots, childrenOf, labelOf) {
+  svg.innerHTML = "";
+  const placed = layoutTree(roots, childrenOf);
+  if (!placed.length) return;
+
+  const px = (f) => NODE_RADIUS + 4 + f.x * X_STEP;
+  const py = (f) => NODE_RADIUS + 4 + f.depth * Y_STEP;
+  const width = Math.max(...placed.map(px)) + NODE_RADIUS + 4;
+  const height = Math.max(...placed.map(py)) + NODE_RADIUS + 4;
+  svg.setAttribute("viewBox", `0 0 ${width} ${height}`);
+
+  const edges = svgElement("g", { stroke: "black" });
+  const nodes = svgElement("g", {});
+  placed.forEach((f) => {
+    if (f.parent) {
+      edges.appendChild(svgElement("line", { x1: px(f.parent), y1: py(f.parent), x2: px(f), y2: py(f) }));
+    }
+    const group = svgElement("g", { transform: `translate(${px(f)},${py(f)})` });
+    group.appendChild(svgElement("circle", { r: NODE_RADIUS, fill: "white", stroke: "black" }));
+    const lines = [].concat(labelOf(f.node));
+    lines.forEach((line, i) => {
+      const text = svgElement("text", {
+        "text-anchor": "middle",
+        "font-size": i === 0 ? 11 : 8,
+        dy: lines.length === 1 ? 4 : i === 0 ? -1 : 9,
+      });
+      text.textContent = line;
+      group.appendChild(text);
+    });
+    nodes.appendChild(group);
+  });
+  svg.appendChild(edges);
+  svg.appendChild(nodes);
+}
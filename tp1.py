@@ -0,0 +1,91 @@
+#       TP1 : construction et rendu (exécutable dans un processus de rendu)
+
+from tp1_algo import (
+    construire_abr, construire_avl, construire_tas, construire_amr, construire_btree,
+    stats_arbre, stats_tas,
+    construire_graphe, densite_graphe
+)
+from metrics import phase
+from rendering import graphe_to_base64, lod_graph, HeapNode, ForestRoot
+
+
+def construire_arbre(type_arbre, valeurs, form):
+    """Arbre du type demandé (ABR par défaut) ; liste de racines pour un AMR."""
+    if type_arbre == 'AVL':
+        return construire_avl(valeurs)
+    if type_arbre == 'AMR':
+        nb_racines = form.get('nb_racines')
+        try:
+            nb_racines = int(nb_racines) if nb_racines else 2
+        except:
+            nb_racines = 2
+        return construire_amr(valeurs, nb_racines=nb_racines)
+    if type_arbre == 'B-arbre':
+        t = form.get('bordre')
+        try:
+            t = int(t) if t else 2
+        except:
+            t = 2
+        return construire_btree(valeurs, t=t)
+    return construire_abr(valeurs)
+
+
+def run_tp1(form):
+    """Calcule les résultats de TP1 à partir d'un dictionnaire de formulaire (choix = liste)."""
+    resultats = {}
+    choix = form.get('choix', [])
+    valeurs_arbre_str = form.get('valeurs_arbre', '')
+    valeurs_graphe_str = form.get('valeurs_graphe', '')
+
+    with phase('parse'):
+        valeurs_arbre = [int(v.strip()) for v in valeurs_arbre_str.split(',') if v.strip().lstrip('-').isdigit()]
+        valeurs_graphe = [v.strip() for v in valeurs_graphe_str.split(',') if v.strip()]
+
+    # --- ARBRE ---
+    if 'arbre' in choix and valeurs_arbre:
+        type_arbre = form.get('type_arbre', 'ABR')
+
+        if type_arbre == 'Tas':
+            type_tas = form.get('type_tas', 'min')
+            with phase('build'):
+                heap = construire_tas(valeurs_arbre, type_tas)
+                # Tas implicite vu comme un arbre : même budget de rendu que les autres types
+                G = lod_graph(HeapNode(heap, kind=type_tas))
+            resultats['arbre_img'] = graphe_to_base64(G)
+            with phase('algorithm'):
+                stats = stats_tas(len(heap))
+        else:
+            with phase('build'):
+                root = construire_arbre(type_arbre, valeurs_arbre, form)
+
+            if isinstance(root, list):
+                with phase('build'):
+                    # Forêt AMR : les racines sont rattachées à une racine virtuelle
+                    G_arbre = lod_graph(ForestRoot(root))
+                resultats['arbre_img'] = graphe_to_base64(G_arbre, title="AMR")
+            else:
+                with phase('build'):
+                    # Au-delà du budget, seuls les niveaux supérieurs sont dessinés, le reste résumé
+                    G_img = lod_graph(root)
+                resultats['arbre_img'] = graphe_to_base64(G_img)
+            # Métriques maintenues pendant la construction : lues sur la racine
+            with phase('algorithm'):
+                stats = stats_arbre(root)
+
+        resultats['arbre_hauteur'] = stats['hauteur']
+        resultats['arbre_degre'] = stats['degre']
+        resultats['arbre_densite'] = stats['densite']
+
+    # --- GRAPHE ---
+    if 'graphe' in choix and valeurs_graphe:
+        oriente = form.get('oriente') in ['on','true']
+        pondere = form.get('pondere') in ['on','true']
+        with phase('build'):
+            G_graph = construire_graphe(valeurs_graphe, oriente, pondere)
+        resultats['graphe_img'] = graphe_to_base64(G_graph)
+        with phase('algorithm'):
+            degres = dict(G_graph.degree()).values()
+            resultats['graphe_degre'] = max(degres) if degres else 0
+            resultats['graphe_densite'] = densite_graphe(G_graph) if G_graph.number_of_nodes() > 0 else 0
+
+    return resultats
@@ -1,49 +1,76 @@
-import networkx as nx
 import heapq
+from bisect import insort
 
 
 #        ARBRES
 
+# Chaque nœud garde la hauteur, la taille et le degré maximal de son sous-arbre,
+# mis à jour à chaque insertion ou rotation : les métriques de l'arbre entier se
+# lisent sur la racine (voir stats_arbre), sans parcours ni conversion networkx.
+# `degre` compte chaque nœud avec son arête vers un parent, racine comprise.
+
 
 class Node:
+    __slots__ = ('val', 'left', 'right', 'height', 'size', 'degre')
+
     def __init__(self, val):
         self.val = val
         self.left = None
         self.right = None
+        self.height = 1
+        self.size = 1
+        self.degre = 1
+
+    def enfants(self):
+        return [c for c in (self.left, self.right) if c is not None]
+
+    def update_stats(self):
+        l, r = self.left, self.right
+        self.height = 1 + max(l.height if l else 0, r.height if r else 0)
+        self.size = 1 + (l.size if l else 0) + (r.size if r else 0)
+        self.degre = max((l is not None) + (r is not None) + 1,
+                         l.degre if l else 0, r.degre if r else 0)
 
 
 def construire_abr(valeurs):
-    if not valeurs:
+    # Accepte n'importe quel itérable (liste ou flux de valeurs)
+    it = iter(valeurs)
+    first = next(it, None)
+    if first is None:
         return None
-    root = Node(valeurs[0])
-    for v in valeurs[1:]:
+    root = Node(first)
+    for v in it:
         insert_abr(root, v)
     return root
 
 def insert_abr(root, val):
-    if val < root.val:
-        if root.left is None:
-            root.left = Node(val)
-        else:
-            insert_abr(root.left, val)
-    else:
-        if root.right is None:
-            root.right = Node(val)
+    # Itératif : un ABR construit sur des valeurs triées dégénère en liste
+    node, chemin = root, []
+    while True:
+        chemin.append(node)
+        if val < node.val:
+            if node.left is None:
+                node.left = Node(val)
+                break
+            node = node.left
         else:
-            insert_abr(root.right, val)
+            if node.right is None:
+                node.right = Node(val)
+                break
+            node = node.right
+    for node in reversed(chemin):
+        node.update_stats()
 
 
 
 class AVLNode(Node):
-    def __init__(self, val):
-        super().__init__(val)
-        self.height = 1
+    __slots__ = ()
 
 def get_height(node):
     return node.height if node else 0
 
 def update_height(node):
-    node.height = 1 + max(get_height(node.left), get_height(node.right))
+    node.update_stats()
 
 def get_balance(node):
     return get_height(node.left) - get_height(node.right) if node else 0
@@ -75,15 +102,14 @@ def insert_avl(root, val):
         root.right = insert_avl(root.right, val)
     update_height(root)
     balance = get_balance(root)
-    if balance > 1 and val < root.left.val:
-        return rotate_right(root)
-    if balance < -1 and val > root.right.val:
-        return rotate_left(root)
-    if balance > 1 and val > root.left.val:
-        root.left = rotate_left(root.left)
+    # Cas choisi d'après l'équilibre du fils, pas la valeur : correct aussi avec des doublons
+    if balance > 1:
+        if get_balance(root.left) < 0:
+            root.left = rotate_left(root.left)
         return rotate_right(root)
-    if balance < -1 and val < root.right.val:
-        root.right = rotate_right(root.right)
+    if balance < -1:
+        if get_balance(root.right) > 0:
+            root.right = rotate_right(root.right)
         return rotate_left(root)
     return root
 
@@ -97,7 +123,7 @@ def construire_avl(valeurs):
 
 def construire_tas(valeurs, type_tas="min"):
     if type_tas == "min":
-        h = valeurs[:]
+        h = list(valeurs)
         heapq.heapify(h)
         return h
     elif type_tas == "max":
@@ -109,36 +135,54 @@ def construire_tas(valeurs, type_tas="min"):
 
 
 
-class AMRNode:
+class _NaryStats:
+    __slots__ = ()
+
+    def enfants(self):
+        return self.children
+
+    def update_stats(self):
+        kids = self.children
+        self.height = 1 + max((c.height for c in kids), default=0)
+        self.size = 1 + sum(c.size for c in kids)
+        self.degre = max(len(kids) + 1, max((c.degre for c in kids), default=0))
+
+
+class AMRNode(_NaryStats):
+    __slots__ = ('val', 'children', 'height', 'size', 'degre')
+
     def __init__(self, val):
         self.val = val
         self.children = []
+        self.height = 1
+        self.size = 1
+        self.degre = 1
 
 def construire_amr(valeurs, nb_racines=2):
-    if not valeurs:
-        return []
-    racines = [AMRNode(valeurs[i]) for i in range(min(nb_racines, len(valeurs)))]
-    index = nb_racines
+    it = iter(valeurs)
+    racines = [AMRNode(v) for _, v in zip(range(nb_racines), it)]
     for root in racines:
-        for _ in range(2):
-            if index < len(valeurs):
-                enfant = AMRNode(valeurs[index])
-                root.children.append(enfant)
-                index += 1
+        for _, v in zip(range(2), it):
+            root.children.append(AMRNode(v))
+        root.update_stats()
     return racines
 
 
 
-class BTreeNode:
+class BTreeNode(_NaryStats):
+    __slots__ = ('keys', 'children', 'leaf', 't', 'height', 'size', 'degre')
+
     def __init__(self, t):
         self.keys = []
         self.children = []
         self.leaf = True
         self.t = t
+        self.height = 1
+        self.size = 1
+        self.degre = 1
 
 def insert_btree(node, key):
-    node.keys.append(key)
-    node.keys.sort()
+    insort(node.keys, key)
 
 def construire_btree(valeurs, t=2):
     if t < 2:
@@ -151,17 +195,48 @@ def construire_btree(valeurs, t=2):
 
 
 def hauteur_arbre(root):
+    # Hauteur maintenue sur la racine ; une forêt (AMR) compte sa super-racine
     if not root:
         return 0
     if isinstance(root, list):
-        return 1 + max((hauteur_arbre(r) for r in root), default=0)
-    if hasattr(root, 'children'):
-        return 1 + max((hauteur_arbre(c) for c in root.children), default=0)
-    return 1 + max(hauteur_arbre(root.left), hauteur_arbre(root.right))
+        return 1 + max((r.height for r in root), default=0)
+    return root.height
+
+
+def _densite(n_noeuds, n_aretes):
+    # Même définition que nx.density pour un graphe non orienté
+    return 2 * n_aretes / (n_noeuds * (n_noeuds - 1)) if n_noeuds > 1 else 0
+
+
+def stats_arbre(root):
+    """Hauteur, taille, degré maximal et densité lus sur la racine, en O(1).
+
+    Une forêt (liste de racines, AMR) est reliée à une super-racine, comme dans son dessin."""
+    if not root:
+        return {'hauteur': 0, 'taille': 0, 'degre': 0, 'densite': 0}
+    if isinstance(root, list):
+        taille = 1 + sum(r.size for r in root)
+        degre = max(len(root), max((r.degre for r in root), default=0))
+    else:
+        taille = root.size
+        kids = root.enfants()
+        degre = max(len(kids), max((c.degre for c in kids), default=0))
+    return {'hauteur': hauteur_arbre(root), 'taille': taille, 'degre': degre,
+            'densite': _densite(taille, taille - 1)}
+
+
+def stats_tas(n):
+    """Mêmes métriques pour un tas binaire de n éléments (arbre complet implicite)."""
+    if n <= 1:
+        return {'hauteur': n, 'taille': n, 'degre': 0, 'densite': 0}
+    # Un nœud interne non racine a 1 parent + 2 enfants dès qu'il existe (n >= 5)
+    degre = 3 if n >= 5 else 2 if n >= 3 else 1
+    return {'hauteur': n.bit_length(), 'taille': n, 'degre': degre, 'densite': _densite(n, n - 1)}
 
 
  
 def arbre_to_nx(root):
+    import networkx as nx
     G = nx.Graph()
     def add_edges(node):
         if not node:
@@ -187,6 +262,7 @@ def arbre_to_nx(root):
 
 # --- GRAPHE ---
 def construire_graphe(valeurs, oriente=False, pondere=False):
+    import networkx as nx
     G = nx.DiGraph() if oriente else nx.Graph()
     for v in valeurs:
         G.add_node(v)
@@ -200,4 +276,5 @@ def construire_graphe(valeurs, oriente=False, pondere=False):
 
 # DENSITÉ 
 def densite_graphe(G):
+    import networkx as nx
     return nx.density(G)
@@ -1,16 +1,21 @@
-import random, math, time, io, base64
+import random, math, io, base64
+from metrics import collect, phase
 from treap import Treap
-import networkx as nx
-import matplotlib.pyplot as plt
-
-plt.switch_backend('Agg')
+from priorities import make_priority_source, with_priorities
+from rendering import hierarchy_pos, lod_graph, networkx, pyplot
 
 # ---------- Fonctions utilitaires ----------
+def _parse(text, convert, nom):
+    try:
+        return [convert(v.strip()) for v in text.split(",") if v.strip()]
+    except ValueError:
+        raise ValueError(f"{nom} invalides : nombres séparés par des virgules attendus") from None
+
 def parse_keys(values_str):
-    return [int(v.strip()) for v in values_str.split(",") if v.strip()]
+    return _parse(values_str, int, "Clés")
 
 def parse_priorities(priorities_str):
-    return [float(p.strip()) for p in priorities_str.split(",") if p.strip()]
+    return _parse(priorities_str, float, "Priorités")
 
 def compute_theory(n):
     log_n = round(math.log2(n), 2) if n > 1 else 1
@@ -22,103 +27,115 @@ def compute_theory(n):
     }
 
 # ---------- Visualisation ----------
-def hierarchy_pos(G, root=None, width=1., vert_gap=0.2, vert_loc=0, xcenter=0.5):
-    if not nx.is_tree(G):
-        return nx.spring_layout(G)
-    if root is None:
-        root = next(iter(G.nodes))
-    def _hierarchy_pos(G, root, width=1., vert_gap=0.2, vert_loc=0, xcenter=0.5,
-                       pos=None, parent=None):
-        if pos is None:
-            pos = {root: (xcenter, vert_loc)}
-        neighbors = [n for n in G.neighbors(root) if n != parent]
-        if neighbors:
-            dx = width / len(neighbors)
-            nextx = xcenter - width/2 - dx/2
-            for neighbor in neighbors:
-                nextx += dx
-                pos[neighbor] = (nextx, vert_loc - vert_gap)
-                pos = _hierarchy_pos(G, neighbor, width=dx, vert_gap=vert_gap,
-                                     vert_loc=vert_loc - vert_gap, xcenter=nextx,
-                                     pos=pos, parent=root)
-        return pos
-    return _hierarchy_pos(G, root, width, vert_gap, vert_loc, xcenter)
-
 def treap_to_base64(treap, title=None):
-    plt.figure(figsize=(8,6))
-    if not treap.root:
-        plt.text(0.5, 0.5, "Arbre vide", fontsize=20, ha='center')
-        plt.axis('off')
-    else:
-        G = nx.DiGraph()
-        def add_edges(node):
-            if not node:
-                return
-            G.add_node(f"{node.key}\n(p={round(node.priority,3)})")
-            if node.left:
-                G.add_edge(f"{node.key}\n(p={round(node.priority,3)})",
-                           f"{node.left.key}\n(p={round(node.left.priority,3)})")
-                add_edges(node.left)
-            if node.right:
-                G.add_edge(f"{node.key}\n(p={round(node.priority,3)})",
-                           f"{node.right.key}\n(p={round(node.right.priority,3)})")
-                add_edges(node.right)
-        add_edges(treap.root)
-        root_label = next(iter(G.nodes))
-        pos = hierarchy_pos(G, root=root_label)
-        nx.draw(G, pos, with_labels=True, node_size=900, node_color="white", edgecolors="black")
-    if title:
-        plt.title(title)
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png", bbox_inches='tight', dpi=150)
-    buf.seek(0)
-    img_base64 = base64.b64encode(buf.getvalue()).decode("ascii")
-    plt.close()
+    nx, plt = networkx(), pyplot()
+    G = pos = None
+    if treap.root:
+        with phase('layout'):
+            G = lod_graph(treap.root, label=lambda node: f"{node.key}\n(p={round(node.priority,3)})")
+            pos = hierarchy_pos(G, root=id(treap.root))
+    with phase('render'):
+        plt.figure(figsize=(8,6))
+        if G is None:
+            plt.text(0.5, 0.5, "Arbre vide", fontsize=20, ha='center')
+            plt.axis('off')
+        else:
+            nx.draw(G, pos, labels=nx.get_node_attributes(G, 'label'),
+                    node_size=900 if len(G) <= 60 else 300, node_color="white", edgecolors="black")
+        if title:
+            plt.title(title)
+    with phase('encode'):
+        buf = io.BytesIO()
+        plt.savefig(buf, format="png", bbox_inches='tight', dpi=150)
+        img_base64 = base64.b64encode(buf.getvalue()).decode("ascii")
+        plt.close()
     return img_base64
 
 # ---------- Construction du Treap ----------
-def build_treap(keys, priority_mode, priorities_in, heap_type):
+def build_treap(keys, priority_mode, priorities_in, heap_type, source=None):
+    """Construit le Treap ; les priorités manquantes viennent de `source` (générées par lots).
+
+    Retourne (treap, nombre de priorités générées)."""
+    treap = Treap(heap_type.upper())
+    source = source or make_priority_source()
+    given = list(zip(keys, priorities_in)) if priority_mode == "manual" else []
+    generated = list(with_priorities(keys[len(given):], source))
+    treap.load(given + generated)
+    return treap, len(generated)
+
+def load_treap(values, heap_type, source=None):
+    """Construit un Treap à partir d'un flux de clés ou de paires [clé, priorité]."""
     treap = Treap(heap_type.upper())
-    if priority_mode == "manual":
-        for i, k in enumerate(keys):
-            p = priorities_in[i] if i < len(priorities_in) else random.random()
-            treap.insert(k, p)
-    else:
-        for k in keys:
-            treap.insert(k, random.random())
-    return treap
+    source = source or make_priority_source()
+
+    def pairs():
+        # Les clés sans priorité sont regroupées pour être servies par lots
+        pending = []
+        for v in values:
+            if isinstance(v, list):
+                yield from with_priorities(pending, source)
+                pending = []
+                yield v[0], v[1]
+            else:
+                pending.append(v)
+                if len(pending) >= 4096:
+                    yield from with_priorities(pending, source)
+                    pending = []
+        yield from with_priorities(pending, source)
+
+    inserted, duplicates = treap.load(pairs())
+    return treap, inserted, duplicates
+
+def iter_sorted(treap, method):
+    """Clés triées produites au fil de l'eau : parcours en ordre (abr) ou extraction du minimum (tas).
+
+    Retirer la racine donnerait l'ordre des priorités, pas celui des clés ; `tas`
+    vide donc l'arbre par clé croissante, en libérant les nœuds au passage."""
+    pairs = treap.drain() if method == "tas" else treap.iter_inorder()
+    for key, _ in pairs:
+        yield key
 
 def treap_sort_with_steps(treap):
     steps = []
     steps.append({"label": "Avant suppression", "img": treap_to_base64(treap)})
     sorted_keys = []
     while treap.root is not None:
-        key = treap.root.key
-        sorted_keys.append(key)
-        treap.delete(key)
+        with phase('algorithm'):
+            key = treap.root.key
+            sorted_keys.append(key)
+            treap.delete(key)
         steps.append({"label": f"Suppression clé {key}", "img": treap_to_base64(treap)})
     return sorted_keys, steps
 
 # ---------- Fonction principale ----------
-def run_tp3(values_str, method, priority_mode="auto", heap_type="max", priorities_str=""):
-    keys = parse_keys(values_str)
-    n = len(keys)
-    priorities_in = parse_priorities(priorities_str) if priority_mode=="manual" else []
+def run_tp3(values_str, method, priority_mode="auto", heap_type="max", priorities_str="",
+            seed=None, priority_source="random"):
+    with collect() as phases:
+        with phase('parse'):
+            keys = parse_keys(values_str)
+            priorities_in = parse_priorities(priorities_str) if priority_mode=="manual" else []
+        n = len(keys)
+        if seed is None:
+            # Graine tirée puis renvoyée : toute exécution peut être rejouée à l'identique
+            seed = random.randrange(2 ** 32)
 
-    treap = build_treap(keys, priority_mode, priorities_in, heap_type)
-    start_time = time.time()
+        with phase('build'):
+            treap, generated = build_treap(keys, priority_mode, priorities_in, heap_type,
+                                           make_priority_source(priority_source, seed))
 
-    treap.comparisons = 0  # reset compteur avant tri
+        treap.comparisons = 0  # reset compteur avant tri
 
-    if method == "abr":
-        sorted_keys = [k for (k, _) in treap.inorder()]
-        steps = [{"label": "Arbre complet", "img": treap_to_base64(treap)}]
-    elif method == "tas":
-        sorted_keys, steps = treap_sort_with_steps(treap)
-    else:
-        sorted_keys, steps = [], []
+        # time_sec ne couvre que le tri : les rendus des étapes sont comptés à part
+        if method == "abr":
+            with phase('algorithm'):
+                sorted_keys = [k for (k, _) in treap.inorder()]
+            steps = [{"label": "Arbre complet", "img": treap_to_base64(treap)}]
+        elif method == "tas":
+            sorted_keys, steps = treap_sort_with_steps(treap)
+        else:
+            sorted_keys, steps = [], []
 
-    elapsed = round(time.time() - start_time, 5)
+    elapsed = round(phases.get('algorithm', 0.0), 5)
     theorique = compute_theory(n)
 
     return {
@@ -127,6 +144,10 @@ def run_tp3(values_str, method, priority_mode="auto", heap_type="max", prioritie
         "method": method,
         "heap_type": heap_type,
         "priority_mode": priority_mode,
+        "priorities": priorities_in,
+        "priorities_generated": generated if priority_mode == "manual" else 0,
+        "priority_source": priority_source,
+        "seed": seed,
         "theorique": theorique,
         "steps": steps,
         "counters": {
@@ -134,5 +155,6 @@ def run_tp3(values_str, method, priority_mode="auto", heap_type="max", prioritie
             "deletions": len(sorted_keys) if method=="tas" else 0
         },
         "time_sec": elapsed,
+        "phases": {name: round(seconds, 5) for name, seconds in phases.items()},
         "n": n
     }
@@ -1,30 +1,93 @@
-import random
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-from typing import Optional, Tuple, List
-import networkx as nx
+import threading
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional, Tuple, List
+
+if TYPE_CHECKING:
+    import networkx as nx
+
+# Copie à l'écriture : un nœud publié n'est plus jamais modifié. Insertion et
+# suppression recopient le seul chemin qu'elles touchent (O(log n) nœuds) puis
+# publient la nouvelle racine d'une seule affectation. Un lecteur qui a pris
+# la racine parcourt donc une version figée, sans verrou, pendant qu'un
+# écrivain (un seul à la fois) prépare la suivante.
+#
+# Chaque nœud garde aussi la taille et la hauteur de son sous-arbre, recalculées
+# sur les nœuds recopiés : les résumés du rendu (rendering.lod_graph) et
+# get_stats se lisent sur les nœuds sans parcourir l'arbre.
 
 class TreapNode:
     """Nœud d'un arbre Treap"""
+    __slots__ = ("key", "priority", "left", "right", "size", "height")
+
     def __init__(self, key: int, priority: float):
         self.key = key
         self.priority = priority
         self.left: Optional[TreapNode] = None
         self.right: Optional[TreapNode] = None
+        self.size = 1
+        self.height = 1
+
+    def copy(self) -> "TreapNode":
+        node = TreapNode(self.key, self.priority)
+        node.left, node.right = self.left, self.right
+        node.size, node.height = self.size, self.height
+        return node
+
+    def update_stats(self):
+        """Recalcule taille et hauteur d'après les enfants (nœud non encore publié)"""
+        l, r = self.left, self.right
+        self.size = 1 + (l.size if l else 0) + (r.size if r else 0)
+        self.height = 1 + max(l.height if l else 0, r.height if r else 0)
 
 class Treap:
-    def __init__(self, heap_type="MAX"):
-        self.root = None
-        self.heap_type = heap_type.upper()
-        self.comparisons = 0 
-    
     def __init__(self, heap_type: str = "MAX"):
         
-        self.root: Optional[TreapNode] = None
         self.heap_type = heap_type.upper()
         if self.heap_type not in ["MAX", "MIN"]:
             raise ValueError("heap_type doit être 'MAX' ou 'MIN'")
+        self.comparisons = 0
+        # (racine, version) publiés ensemble : la version change à chaque modification de la structure
+        self._state: Tuple[Optional[TreapNode], int] = (None, 0)
         self.operations_log: List[str] = []
+        # Abonnés aux deltas émis par chaque opération, et rotations de l'opération en cours
+        self.listeners: List[Callable[[dict], None]] = []
+        self._rotations: Optional[List[dict]] = None
+        # Un écrivain à la fois ; le journal et les deltas restent dans l'ordre des opérations
+        self._write_lock = threading.Lock()
+        self._log_lock = threading.Lock()
+
+    @property
+    def root(self) -> Optional[TreapNode]:
+        return self._state[0]
+
+    @property
+    def version(self) -> int:
+        return self._state[1]
+
+    def snapshot(self) -> "Treap":
+        """Treap figé sur la version publiée : partage ses nœuds, sans historique ni abonnés"""
+        snap = Treap(self.heap_type)
+        snap._state = self._state
+        return snap
+
+    def subscribe(self, listener: Callable[[dict], None]):
+        """Abonne `listener` aux deltas structurels (insertion, rotations, suppression)"""
+        self.listeners.append(listener)
+
+    def _emit(self, delta: dict):
+        """Complète le delta avec la version et le numéro d'opération puis le diffuse"""
+        delta["version"] = self.version
+        delta["seq"] = len(self.operations_log)
+        delta["message"] = self.operations_log[-1]
+        for listener in self.listeners:
+            listener(delta)
+
+    def _commit(self, root: Optional[TreapNode], changed: bool, message: str, delta: dict):
+        """Publie la nouvelle racine, inscrit l'opération et diffuse son delta"""
+        with self._log_lock:
+            if changed:
+                self._state = (root, self.version + 1)
+            self.operations_log.append(message)
+            self._emit(delta)
     
     def _compare_priority(self, p1: float, p2: float) -> bool:
         """Compare deux priorités selon le type de heap"""
@@ -34,17 +97,25 @@ class Treap:
             return p1 < p2
     
     def _rotate_right(self, node: TreapNode) -> TreapNode:
-        """Rotation droite"""
+        """Rotation droite (node et son fils gauche doivent être des copies non publiées)"""
+        if self._rotations is not None:
+            self._rotations.append({"dir": "right", "key": node.key})
         left_child = node.left
         node.left = left_child.right
         left_child.right = node
+        node.update_stats()
+        left_child.update_stats()
         return left_child
     
     def _rotate_left(self, node: TreapNode) -> TreapNode:
         
+        if self._rotations is not None:
+            self._rotations.append({"dir": "left", "key": node.key})
         right_child = node.right
         node.right = right_child.left
         right_child.left = node
+        node.update_stats()
+        right_child.update_stats()
         return right_child
     
     def insert(self, key: int, priority: float) -> bool:
@@ -52,105 +123,294 @@ class Treap:
         if not (0 < priority < 1):
             raise ValueError("La priorité doit être entre 0 et 1 (exclusif)")
         
-        self.root, inserted = self._insert_recursive(self.root, key, priority)
-        if inserted:
-            self.operations_log.append(f"✓ Insertion: clé={key}, priorité={priority:.2f}")
-        else:
-            self.operations_log.append(f"✗ Insertion échouée: clé={key} existe déjà")
+        with self._write_lock:
+            self._rotations = []
+            root, inserted = self._insert_node(self.root, key, priority)
+            rotations, self._rotations = self._rotations, None
+            if inserted:
+                message = f"✓ Insertion: clé={key}, priorité={priority:.2f}"
+            else:
+                message = f"✗ Insertion échouée: clé={key} existe déjà"
+            self._commit(root, inserted, message, {"type": "insert", "key": key, "priority": priority,
+                                                   "changed": inserted, "rotations": rotations})
         return inserted
     
-    def _insert_recursive(self, node: Optional[TreapNode], key: int, priority: float) -> Tuple[TreapNode, bool]:
-        
-        if node is None:
-            return TreapNode(key, priority), True
-        
-        if key == node.key:
-            return node, False  # Clé existe déjà
-        
-        if key < node.key:
-            node.left, inserted = self._insert_recursive(node.left, key, priority)
-            if inserted and node.left and self._compare_priority(node.left.priority, node.priority):
-                node = self._rotate_right(node)
-        else:
-            node.right, inserted = self._insert_recursive(node.right, key, priority)
-            if inserted and node.right and self._compare_priority(node.right.priority, node.priority):
-                node = self._rotate_left(node)
-        
-        return node, inserted
+    def _insert_node(self, root: Optional[TreapNode], key: int, priority: float,
+                     copy: bool = True) -> Tuple[TreapNode, bool]:
+        """Renvoie la nouvelle racine ; seuls les nœuds du chemin sont recopiés.
+
+        Itératif (descente puis remontée avec rotations) : un arbre dégénéré,
+        par exemple avec des priorités adverses, ne dépasse pas la pile d'appels."""
+        path, node = [], root
+        while node is not None:
+            if key == node.key:
+                return root, False  # Clé existe déjà
+            path.append(node)
+            node = node.left if key < node.key else node.right
+
+        child = TreapNode(key, priority)
+        for node in reversed(path):
+            node = node.copy() if copy else node
+            if key < node.key:
+                node.left = child
+                if self._compare_priority(child.priority, node.priority):
+                    node = self._rotate_right(node)
+                else:
+                    node.update_stats()
+            else:
+                node.right = child
+                if self._compare_priority(child.priority, node.priority):
+                    node = self._rotate_left(node)
+                else:
+                    node.update_stats()
+            child = node
+        return child, True
+    
+    def load(self, pairs: Iterable[Tuple[int, float]]) -> Tuple[int, int]:
+        """Insertion en masse de paires (clé, priorité), sans historique ni delta par clé.
+
+        Retourne (insérées, doublons ignorés)."""
+        inserted = duplicates = 0
+        with self._write_lock:
+            root = self.root
+            # Dans un arbre vide, aucun nœud n'est encore visible : inutile de recopier
+            copy = root is not None
+            for key, priority in pairs:
+                if not (0 < priority < 1):
+                    raise ValueError("La priorité doit être entre 0 et 1 (exclusif)")
+                root, ok = self._insert_node(root, key, priority, copy)
+                if ok:
+                    inserted += 1
+                else:
+                    duplicates += 1
+            self._commit(root, inserted > 0, f"✓ Chargement: {inserted} clés, {duplicates} doublons ignorés",
+                         {"type": "bulk", "count": inserted, "changed": inserted > 0})
+        return inserted, duplicates
     
-    def search(self, key: int) -> Optional[float]:
+    def search(self, key: int, finger: Optional["Finger"] = None) -> Optional[float]:
         
-        node = self._search_recursive(self.root, key)
+        # Lecture sans verrou sur la racine publiée ; seul l'historique est sérialisé
+        node = finger.find(key) if finger is not None else self._search_node(self.root, key)
         if node:
-            self.operations_log.append(f"✓ Recherche: clé={key} trouvée (priorité={node.priority:.2f})")
-            return node.priority
+            message = f"✓ Recherche: clé={key} trouvée (priorité={node.priority:.2f})"
         else:
-            self.operations_log.append(f"✗ Recherche: clé={key} non trouvée")
-            return None
+            message = f"✗ Recherche: clé={key} non trouvée"
+        self._commit(None, False, message, {"type": "search", "key": key, "found": node is not None,
+                                            "changed": False})
+        return node.priority if node else None
     
-    def _search_recursive(self, node: Optional[TreapNode], key: int) -> Optional[TreapNode]:
-        
-        if node is None:
-            return None
-        
-        if key == node.key:
-            return node
-        elif key < node.key:
-            return self._search_recursive(node.left, key)
-        else:
-            return self._search_recursive(node.right, key)
+    def _search_node(self, node: Optional[TreapNode], key: int) -> Optional[TreapNode]:
+        """Descente itérative depuis `node`"""
+        while node is not None and key != node.key:
+            node = node.left if key < node.key else node.right
+        return node
     
     def delete(self, key: int) -> bool:
         
-        self.root, deleted = self._delete_recursive(self.root, key)
-        if deleted:
-            self.operations_log.append(f"✓ Suppression: clé={key}")
-        else:
-            self.operations_log.append(f"✗ Suppression échouée: clé={key} non trouvée")
+        with self._write_lock:
+            self._rotations = []
+            root, deleted = self._delete_node(self.root, key)
+            rotations, self._rotations = self._rotations, None
+            if deleted:
+                message = f"✓ Suppression: clé={key}"
+            else:
+                message = f"✗ Suppression échouée: clé={key} non trouvée"
+            self._commit(root, deleted, message, {"type": "delete", "key": key, "changed": deleted,
+                                                  "rotations": rotations})
         return deleted
     
-    def _delete_recursive(self, node: Optional[TreapNode], key: int) -> Tuple[Optional[TreapNode], bool]:
-        
+    def _delete_node(self, root: Optional[TreapNode], key: int) -> Tuple[Optional[TreapNode], bool]:
+        """Renvoie la nouvelle racine ; seuls les nœuds du chemin sont recopiés.
+
+        Itératif comme _insert_node : descente jusqu'à la clé, rotations vers le
+        bas tant que le nœud a deux enfants, puis remontée qui relie les copies."""
+        # (nœud, côté gauche, déjà recopié) pour chaque parent du nœud à retirer
+        path, node = [], root
+        while node is not None and key != node.key:
+            path.append((node, key < node.key, False))
+            node = node.left if key < node.key else node.right
         if node is None:
-            return None, False
-        
-        if key < node.key:
-            node.left, deleted = self._delete_recursive(node.left, key)
-            return node, deleted
-        elif key > node.key:
-            node.right, deleted = self._delete_recursive(node.right, key)
-            return node, deleted
-        else:
-            # Nœud trouvé
-            if node.left is None:
-                return node.right, True
-            elif node.right is None:
-                return node.left, True
+            return root, False
+
+        # Deux enfants: rotation vers le fils avec priorité plus élevée (sur des copies)
+        fresh = False
+        while node.left is not None and node.right is not None:
+            node = node if fresh else node.copy()
+            fresh = True
+            if self._compare_priority(node.left.priority, node.right.priority):
+                node.left = node.left.copy()
+                path.append((self._rotate_right(node), False, True))
             else:
-                # Deux enfants: rotation vers le fils avec priorité plus élevée
-                if self._compare_priority(node.left.priority, node.right.priority):
-                    node = self._rotate_right(node)
-                    node.right, deleted = self._delete_recursive(node.right, key)
-                else:
-                    node = self._rotate_left(node)
-                    node.left, deleted = self._delete_recursive(node.left, key)
-                return node, deleted
+                node.right = node.right.copy()
+                path.append((self._rotate_left(node), True, True))
+
+        child = node.left if node.left is not None else node.right
+        for parent, left, copied in reversed(path):
+            parent = parent if copied else parent.copy()
+            if left:
+                parent.left = child
+            else:
+                parent.right = child
+            parent.update_stats()
+            child = parent
+        return child, True
     
+    def insert_many(self, pairs: Iterable[Tuple[int, float]]) -> Tuple[int, int]:
+        """Insertion groupée de paires (clé, priorité) triées par clé croissante.
+
+        Le lot est d'abord construit en Treap en O(m) (arbre cartésien), puis réuni
+        à l'arbre publié : seuls les chemins où les deux arbres se croisent sont
+        recopiés, en O(m log(n/m + 1)). Une seule version est publiée.
+        Retourne (insérées, doublons ignorés)."""
+        batch, count, duplicates = self._build_sorted(pairs)
+        with self._write_lock:
+            root, merged = self._union(self.root, batch)
+            inserted = count - merged
+            duplicates += merged
+            self._commit(root, inserted > 0, f"✓ Insertion groupée: {inserted} clés, {duplicates} doublons ignorés",
+                         {"type": "bulk", "count": inserted, "changed": inserted > 0})
+        return inserted, duplicates
+
+    def _build_sorted(self, pairs: Iterable[Tuple[int, float]]) -> Tuple[Optional[TreapNode], int, int]:
+        """Treap d'un lot trié, par pile (arbre cartésien) ; renvoie (racine, nœuds, doublons du lot)"""
+        stack: List[TreapNode] = []
+        count = duplicates = 0
+        for key, priority in pairs:
+            if not (0 < priority < 1):
+                raise ValueError("La priorité doit être entre 0 et 1 (exclusif)")
+            if count:
+                if key == prev:
+                    duplicates += 1
+                    continue
+                if key < prev:
+                    raise ValueError("insert_many attend des clés triées par ordre croissant")
+            node, last = TreapNode(key, priority), None
+            # Les nœuds de la branche droite moins prioritaires passent sous le nouveau nœud ;
+            # un nœud qui quitte la pile a son sous-arbre complet
+            while stack and self._compare_priority(priority, stack[-1].priority):
+                last = stack.pop()
+                last.update_stats()
+            node.left = last
+            if stack:
+                stack[-1].right = node
+            stack.append(node)
+            prev, count = key, count + 1
+        for node in reversed(stack):
+            node.update_stats()
+        return (stack[0] if stack else None), count, duplicates
+
+    def _split(self, node: Optional[TreapNode], key: int, copy: bool):
+        """(clés < key, nœud de clé key ou None, clés > key) ; recopie le chemin si `copy`"""
+        if node is None:
+            return None, None, None
+        if key < node.key:
+            left, found, right = self._split(node.left, key, copy)
+            node = node.copy() if copy else node
+            node.left = right
+            node.update_stats()
+            return left, found, node
+        if key > node.key:
+            left, found, right = self._split(node.right, key, copy)
+            node = node.copy() if copy else node
+            node.right = left
+            node.update_stats()
+            return node, found, right
+        return node.left, node, node.right
+
+    def _merge(self, a: Optional[TreapNode], b: Optional[TreapNode]) -> Optional[TreapNode]:
+        """Fusionne deux Treaps neufs (non publiés) dont toutes les clés de `a` précèdent celles de `b`"""
+        if a is None or b is None:
+            return a or b
+        if self._compare_priority(b.priority, a.priority):
+            b.left = self._merge(a, b.left)
+            b.update_stats()
+            return b
+        a.right = self._merge(a.right, b)
+        a.update_stats()
+        return a
+
+    def _union(self, old: Optional[TreapNode], new: Optional[TreapNode]) -> Tuple[Optional[TreapNode], int]:
+        """Réunit l'arbre publié `old` (recopié) et un arbre neuf `new` (modifié sur place).
+
+        Une clé présente des deux côtés garde son nœud publié. Renvoie (racine, doublons)."""
+        if new is None or old is None:
+            return old or new, 0
+        if self._compare_priority(new.priority, old.priority):
+            left, found, right = self._split(old, new.key, True)
+            if found is not None:
+                # Clé déjà publiée : le nœud neuf est retiré, ses deux sous-arbres réunis à l'ancien
+                root, duplicates = self._union(old, self._merge(new.left, new.right))
+                return root, duplicates + 1
+            new.left, d_left = self._union(left, new.left)
+            new.right, d_right = self._union(right, new.right)
+            new.update_stats()
+            return new, d_left + d_right
+        left, found, right = self._split(new, old.key, False)
+        node = old.copy()
+        node.left, d_left = self._union(old.left, left)
+        node.right, d_right = self._union(old.right, right)
+        node.update_stats()
+        return node, d_left + d_right + (found is not None)
+
+    def finger(self) -> "Finger":
+        """Curseur de recherche partant du dernier nœud atteint, pour un appelant qui
+        enchaîne des clés proches sur un arbre peu modifié (un curseur par thread)"""
+        return Finger(self)
+
     def inorder(self) -> List[Tuple[int, float]]:
         """Parcours en ordre (BST)"""
-        result = []
-        self._inorder_recursive(self.root, result)
-        return result
+        return list(self.iter_inorder())
     
-    def _inorder_recursive(self, node: Optional[TreapNode], result: List):
-        
-        if node:
-            self._inorder_recursive(node.left, result)
+    def iter_inorder(self) -> Iterator[Tuple[int, float]]:
+        """Parcours en ordre itératif, produit au fur et à mesure"""
+        stack, node = [], self.root
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.key, node.priority
+            node = node.right
+    
+    def drain(self) -> Iterator[Tuple[int, float]]:
+        """Vide l'arbre en produisant ses paires par clé croissante (extraction du minimum).
+
+        La version publiée devient aussitôt vide, avec son entrée d'historique et
+        un delta "clear" ; les nœuds ne sont plus tenus que par le parcours et
+        sont libérés au fur et à mesure."""
+        with self._write_lock:
+            node = self.root
+            count = self._count_nodes(node)
+            self._commit(None, node is not None, f"✓ Vidage: {count} clés extraites",
+                         {"type": "clear", "count": count, "changed": node is not None})
+        stack = []
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.key, node.priority
+            node = node.right
+    
+    def preorder(self) -> List[Tuple[int, float]]:
+        """Parcours préfixe : réinsérer les clés dans cet ordre redonne la même forme"""
+        result = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
             result.append((node.key, node.priority))
-            self._inorder_recursive(node.right, result)
+            if node.right:
+                stack.append(node.right)
+            if node.left:
+                stack.append(node.left)
+        return result
     
     def visualize(self):
         """Visualise l'arbre avec matplotlib et networkx"""
+        # Importés ici : le Treap lui-même ne dépend d'aucune bibliothèque graphique
+        import matplotlib.pyplot as plt
+        import networkx as nx
+
         if self.root is None:
             print("L'arbre est vide!")
             return
@@ -190,7 +450,7 @@ class Treap:
         plt.tight_layout()
         plt.show()
     
-    def _add_nodes_to_graph(self, node: Optional[TreapNode], G: nx.DiGraph, 
+    def _add_nodes_to_graph(self, node: Optional[TreapNode], G: "nx.DiGraph", 
                            pos: dict, x: float, y: float, layer: int):
         """Ajoute les nœuds au graphe networkx"""
         if node is None:
@@ -253,24 +513,79 @@ class Treap:
     
     def get_stats(self) -> dict:
         """Retourne les statistiques de l'arbre"""
+        snap = self.snapshot()
         return {
             "type_heap": self.heap_type,
-            "nombre_noeuds": self._count_nodes(self.root),
-            "hauteur": self._get_height(self.root),
-            "elements": self.inorder()
+            "nombre_noeuds": self._count_nodes(snap.root),
+            "hauteur": self._get_height(snap.root),
+            "elements": snap.inorder()
         }
     
     def _count_nodes(self, node: Optional[TreapNode]) -> int:
-        """Compte le nombre de nœuds"""
-        if node is None:
-            return 0
-        return 1 + self._count_nodes(node.left) + self._count_nodes(node.right)
+        """Nombre de nœuds, lu sur le nœud"""
+        return node.size if node is not None else 0
     
     def _get_height(self, node: Optional[TreapNode]) -> int:
-        """Calcule la hauteur de l'arbre"""
-        if node is None:
-            return 0
-        return 1 + max(self._get_height(node.left), self._get_height(node.right))
+        """Hauteur du sous-arbre, lue sur le nœud"""
+        return node.height if node is not None else 0
+
+
+class Finger:
+    """Recherche par doigt : garde le chemin racine -> dernier nœud atteint et l'intervalle de clés de
+    chaque sous-arbre du chemin. Une recherche repart du plus profond sous-arbre qui peut contenir
+    la clé : O(log d) en moyenne pour une clé à d rangs de la précédente.
+    Le chemin est abandonné dès qu'une nouvelle racine est publiée."""
+
+    def __init__(self, treap: Treap):
+        self.treap = treap
+        self.root: Optional[TreapNode] = None
+        self.path: List[Tuple[TreapNode, Optional[int], Optional[int]]] = []
+        self.steps = 0
+
+    def find(self, key: int) -> Optional[TreapNode]:
+        root = self.treap.root
+        if root is not self.root:
+            self.root = root
+            self.path = [(root, None, None)] if root is not None else []
+        path = self.path
+        if not path:
+            return None
+        # Les intervalles sont emboîtés le long du chemin : recherche galopante depuis le bas
+        # (1, 2, 4... niveaux plus haut) puis dichotomie, pour repartir du plus profond
+        # sous-arbre qui peut contenir la clé ; la racine les contient toutes
+        good = bad = len(path) - 1
+        jump, steps = 1, 0
+        while good > 0:
+            _, lo, hi = path[good]
+            steps += 1
+            if (lo is None or key > lo) and (hi is None or key < hi):
+                break
+            bad, good = good, max(0, good - jump)
+            jump *= 2
+        while bad - good > 1:
+            mid = (good + bad) // 2
+            _, lo, hi = path[mid]
+            steps += 1
+            if (lo is None or key > lo) and (hi is None or key < hi):
+                good = mid
+            else:
+                bad = mid
+        del path[good + 1:]
+        node, lo, hi = path[-1]
+        while True:
+            steps += 1
+            k = node.key
+            if key == k:
+                break
+            if key < k:
+                node, hi = node.left, k
+            else:
+                node, lo = node.right, k
+            if node is None:
+                break
+            path.append((node, lo, hi))
+        self.steps += steps
+        return node
 
 
 def main():
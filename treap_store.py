@@ -0,0 +1,329 @@
+#       STOCKAGE DES TREAPS DE TP2 (local ou réparti en shards)
+
+# TreapManager garde les arbres dans le processus courant. Avec plusieurs
+# workers web, chacun aurait ses propres arbres : ShardedTreapManager répartit
+# alors les arbres par hachage de tree_id entre des processus shards, chacun
+# propriétaire de ses arbres, joints par sockets Unix. Tout worker web peut
+# ainsi router une opération vers le shard qui possède l'arbre.
+#
+# Les messages sont des pickles : seuls des pairs authentifiés doivent pouvoir
+# se connecter. Les sockets vivent dans un répertoire 0700 appartenant à
+# l'utilisateur (vérifié des deux côtés) et la clé vient de TP_TREAP_AUTHKEY,
+# ou à défaut est tirée au lancement des shards et déposée dans ce répertoire.
+#
+#   python treap_store.py --shards 4 --socket-dir $HOME/.tp-algo-shards
+#   TP_TREAP_SHARDS=4 TP_TREAP_SOCKET_DIR=$HOME/.tp-algo-shards gunicorn -w 8 app:app
+
+import argparse, multiprocessing, os, secrets, stat, tempfile, threading, uuid, zlib
+from collections import deque
+from multiprocessing.connection import Client, Listener
+
+from treap import Treap
+from tree_json import export_tree
+from rendering import lod_graph, LOD_BUDGET
+
+
+class DeltaFeed:
+    """Derniers deltas d'un arbre, attendus par les flux SSE des clients."""
+    def __init__(self, maxlen=256):
+        self.deltas = deque(maxlen=maxlen)
+        self.seq = 0
+        self.cond = threading.Condition()
+
+    def publish(self, delta):
+        with self.cond:
+            self.deltas.append(delta)
+            self.seq = delta['seq']
+            self.cond.notify_all()
+
+    def since(self, after, timeout):
+        with self.cond:
+            self.cond.wait_for(lambda: self.seq > after, timeout=timeout)
+            if self.seq <= after:
+                return []
+            if not self.deltas or self.deltas[0]['seq'] > after + 1:
+                # Le client a manqué des deltas : il doit recharger l'arbre complet
+                return [{"type": "reset", "seq": self.seq}]
+            return [d for d in self.deltas if d['seq'] > after]
+
+
+class TreapManager:
+    def __init__(self):
+        self.trees = {}
+        self.feeds = {}
+        # Dernier rendu par arbre : (version, format, octets)
+        self.images = {}
+
+    def create_tree(self, heap_type='MAX', tree_id=None):
+        tree_id = tree_id or str(uuid.uuid4())
+        tree = Treap(heap_type)
+        self.feeds[tree_id] = DeltaFeed()
+        tree.subscribe(self.feeds[tree_id].publish)
+        self.trees[tree_id] = tree
+        return tree_id
+
+    def deltas_since(self, tree_id, after, timeout=15):
+        """Deltas de numéro > `after`, en attendant au plus `timeout` secondes ; None si l'arbre n'existe pas."""
+        feed = self.feeds.get(tree_id)
+        if feed is None:
+            return None
+        return feed.since(after, timeout)
+
+    def insert(self, tree_id, key, priority):
+        tree = self.trees.get(tree_id)
+        if not tree:
+            return {"success": False, "error": "Arbre non trouvé"}
+        try:
+            tree.insert(int(key), float(priority))
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+        return {"success": True}
+
+    def search(self, tree_id, key):
+        tree = self.trees.get(tree_id)
+        if not tree:
+            return {"success": False, "error": "Arbre non trouvé"}
+        # Recherche simple depuis la racine : chaque requête web a son propre thread et chaque
+        # publication invalide les doigts, un Finger n'aurait presque jamais servi deux fois
+        found = tree.search(int(key))
+        return {"success": True, "found": found is not None}
+
+    def insert_many(self, tree_id, items):
+        """Insère des paires [clé, priorité] en un seul lot (triées ici, publiées en une version)."""
+        tree = self.trees.get(tree_id)
+        if not tree:
+            return {"success": False, "error": "Arbre non trouvé"}
+        try:
+            pairs = sorted((int(key), float(priority)) for key, priority in items)
+            inserted, duplicates = tree.insert_many(pairs)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+        return {"success": True, "inserted": inserted, "duplicates": duplicates}
+
+    def delete(self, tree_id, key):
+        tree = self.trees.get(tree_id)
+        if not tree:
+            return {"success": False, "error": "Arbre non trouvé"}
+        deleted = tree.delete(int(key))
+        return {"success": True, "deleted": deleted}
+
+    def get_state(self, tree_id):
+        """Version de la structure et longueur de l'historique, sans parcourir l'arbre."""
+        tree = self.trees.get(tree_id)
+        if not tree:
+            return None
+        return tree.version, len(tree.operations_log)
+
+    def get_tree_data(self, tree_id, structure=False):
+        tree = self.trees.get(tree_id)
+        if not tree:
+            return {"size": 0, "height": 0, "version": 0, "seq": 0, "operations": []}
+        # Taille, hauteur, version et structure lues sur la même version publiée
+        seq, snap = len(tree.operations_log), tree.snapshot()
+        stats = snap.get_stats()
+        data = {"size": stats['nombre_noeuds'], "height": stats['hauteur'],
+                "version": snap.version, "seq": seq,
+                "operations": tree.operations_log[:seq]}
+        if structure:
+            data["preorder"] = snap.preorder()
+        return data
+
+    def export_tree(self, tree_id, fmt='flat'):
+        tree = self.trees.get(tree_id)
+        if tree is None:
+            return None
+        return export_tree('treap', tree.root, fmt)
+
+    def get_cached_image(self, tree_id, version, variant):
+        cached = self.images.get(tree_id)
+        if cached and cached[0] == version and cached[1] == variant:
+            return cached[2]
+        return None
+
+    def store_image(self, tree_id, version, variant, image):
+        self.images[tree_id] = (version, variant, image)
+
+    def visualization_graph(self, tree_id, max_depth=None, node_budget=LOD_BUDGET, focus=None):
+        """(version, graphe networkx d'au plus `node_budget` nœuds), lus sur une même version publiée.
+
+        La version sert de clé au cache d'images et à l'ETag : elle doit être celle du graphe dessiné."""
+        tree = self.trees.get(tree_id)
+        if not tree:
+            return None
+        snap = tree.snapshot()
+        if not snap.root:
+            return None
+        G = lod_graph(snap.root, max_depth, node_budget, focus)
+        return None if G is None else (snap.version, G)
+
+
+#   Shards
+
+AUTHKEY_FILE = 'authkey'
+
+# Méthodes de TreapManager routées vers le shard propriétaire (tree_id en premier argument,
+# sauf create_tree)
+ROUTED = {
+    'create_tree', 'deltas_since', 'insert', 'insert_many', 'search', 'delete', 'get_state', 'get_tree_data',
+    'export_tree', 'get_cached_image', 'store_image', 'visualization_graph',
+}
+
+
+def shard_socket(socket_dir, index):
+    return os.path.join(socket_dir, f'shard-{index}.sock')
+
+
+def check_socket_dir(path):
+    """Le répertoire des sockets doit appartenir à l'utilisateur courant et lui être réservé (0700)."""
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode):
+        raise RuntimeError(f"{path} n'est pas un répertoire")
+    if st.st_uid != os.getuid():
+        raise RuntimeError(f"{path} appartient à un autre utilisateur")
+    if st.st_mode & 0o077:
+        raise RuntimeError(f"{path} est accessible à d'autres utilisateurs (mode {st.st_mode & 0o777:o}, 700 attendu)")
+    return path
+
+
+def prepare_socket_dir(path=None):
+    """Répertoire des sockets : créé en 0700 s'il n'existe pas, temporaire et privé si `path` est None."""
+    if path is None:
+        return tempfile.mkdtemp(prefix='tp-algo-shards-')
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    return check_socket_dir(path)
+
+
+def shard_authkey(socket_dir):
+    """Clé d'authentification : TP_TREAP_AUTHKEY, sinon celle tirée au lancement des shards."""
+    key = os.environ.get('TP_TREAP_AUTHKEY')
+    if key:
+        return key.encode()
+    try:
+        with open(os.path.join(socket_dir, AUTHKEY_FILE), 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        raise RuntimeError(f"Aucune clé pour les shards de {socket_dir} : définissez TP_TREAP_AUTHKEY "
+                           "ou lancez les shards (treap_store.py) dans ce répertoire") from None
+
+
+def shard_for(tree_id, n_shards):
+    # crc32 plutôt que hash() : stable d'un processus à l'autre
+    return zlib.crc32(str(tree_id).encode()) % n_shards
+
+
+def serve_shard(address, authkey):
+    """Boucle d'un shard : un TreapManager, un thread par connexion cliente.
+
+    Pas de verrou global : chaque Treap sérialise ses écrivains et ses lecteurs
+    travaillent sur la racine publiée, sans attendre."""
+    manager = TreapManager()
+    if os.path.exists(address):
+        os.unlink(address)
+    listener = Listener(address, family='AF_UNIX', authkey=authkey)
+
+    def handle(conn):
+        with conn:
+            while True:
+                try:
+                    method, args, kwargs = conn.recv()
+                except EOFError:
+                    return
+                try:
+                    if method not in ROUTED:
+                        raise AttributeError(f"Méthode inconnue : {method}")
+                    result = getattr(manager, method)(*args, **kwargs)
+                    if method == 'export_tree' and result is not None:
+                        result = list(result)
+                    conn.send((True, result))
+                except Exception as e:
+                    conn.send((False, e))
+
+    while True:
+        conn = listener.accept()
+        threading.Thread(target=handle, args=(conn,), daemon=True).start()
+
+
+def start_shards(n_shards, socket_dir):
+    """Lance `n_shards` processus shards et renvoie la liste des processus.
+
+    Sans TP_TREAP_AUTHKEY, une clé aléatoire est tirée et écrite (0600) dans le
+    répertoire des sockets, où les clients la relisent."""
+    prepare_socket_dir(socket_dir)
+    key = os.environ.get('TP_TREAP_AUTHKEY', '').encode()
+    if not key:
+        key = secrets.token_hex(32).encode()
+        fd = os.open(os.path.join(socket_dir, AUTHKEY_FILE), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(key)
+    processes = []
+    for i in range(n_shards):
+        p = multiprocessing.Process(target=serve_shard, args=(shard_socket(socket_dir, i), key),
+                                    name=f'treap-shard-{i}', daemon=True)
+        p.start()
+        processes.append(p)
+    return processes
+
+
+class ShardedTreapManager:
+    """Même interface que TreapManager ; chaque appel part vers le shard propriétaire de l'arbre."""
+    def __init__(self, n_shards, socket_dir):
+        self.n_shards = n_shards
+        self.socket_dir = socket_dir
+        # Une connexion par thread et par shard : une Connection n'est pas partageable
+        self._local = threading.local()
+
+    def _connection(self, index):
+        conns = self._local.__dict__.setdefault('conns', {})
+        if index not in conns:
+            # Clé relue à chaque connexion : les shards peuvent (re)démarrer après le serveur web
+            authkey = shard_authkey(check_socket_dir(self.socket_dir))
+            conns[index] = Client(shard_socket(self.socket_dir, index), family='AF_UNIX', authkey=authkey)
+        return conns[index]
+
+    def _send(self, index, method, args, kwargs=None):
+        conn = self._connection(index)
+        try:
+            conn.send((method, args, kwargs or {}))
+            ok, result = conn.recv()
+        except (EOFError, OSError):
+            # Shard redémarré : la connexion sera rouverte au prochain appel
+            self._local.conns.pop(index, None)
+            raise
+        if not ok:
+            raise result
+        return result
+
+    def create_tree(self, heap_type='MAX', tree_id=None):
+        tree_id = tree_id or str(uuid.uuid4())
+        return self._send(shard_for(tree_id, self.n_shards), 'create_tree', (heap_type, tree_id))
+
+    def __getattr__(self, method):
+        if method not in ROUTED:
+            raise AttributeError(method)
+        return lambda tree_id, *args, **kwargs: self._send(shard_for(tree_id, self.n_shards), method,
+                                                           (tree_id, *args), kwargs)
+
+
+def make_manager():
+    """TreapManager local, ou client des shards si TP_TREAP_SHARDS est défini."""
+    n_shards = int(os.environ.get('TP_TREAP_SHARDS', 0))
+    if n_shards > 0:
+        socket_dir = os.environ.get('TP_TREAP_SOCKET_DIR')
+        if not socket_dir:
+            raise RuntimeError("TP_TREAP_SHARDS exige TP_TREAP_SOCKET_DIR (répertoire donné aux shards)")
+        return ShardedTreapManager(n_shards, socket_dir)
+    return TreapManager()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Lance les shards de Treaps de TP2")
+    parser.add_argument('--shards', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--socket-dir', help="répertoire privé des sockets (temporaire par défaut)")
+    args = parser.parse_args()
+    socket_dir = prepare_socket_dir(args.socket_dir)
+    print(f"Shards dans {socket_dir} (TP_TREAP_SOCKET_DIR)", flush=True)
+    for process in start_shards(args.shards, socket_dir):
+        process.join()
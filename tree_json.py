@@ -0,0 +1,105 @@
+#       EXPORT JSON DES ARBRES (rendu côté client)
+
+import json
+
+from treap import TreapNode
+from tp1_algo import Node, AVLNode, AMRNode, BTreeNode
+
+
+# Champs exportés pour chaque type de nœud, dans l'ordre des lignes "flat"
+def _node_fields(node):
+    if isinstance(node, TreapNode):
+        return ("key", "priority"), (node.key, node.priority)
+    if isinstance(node, AVLNode):
+        return ("key", "height"), (node.val, node.height)
+    if isinstance(node, Node):
+        return ("key",), (node.val,)
+    if isinstance(node, AMRNode):
+        return ("key",), (node.val,)
+    if isinstance(node, BTreeNode):
+        return ("keys",), (node.keys,)
+    raise TypeError(f"Type de nœud non exportable : {type(node).__name__}")
+
+
+def node_children(node):
+    """Enfants d'un nœud ; pour un arbre binaire, [gauche, droite] avec None pour un fils absent."""
+    if hasattr(node, 'children'):
+        return node.children
+    if node.left is None and node.right is None:
+        return []
+    return [node.left, node.right]
+
+
+def _buffered(chunks, size=65536):
+    """Regroupe les petits morceaux JSON pour limiter le nombre d'écritures réseau."""
+    buf, length = [], 0
+    for chunk in chunks:
+        buf.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield ''.join(buf)
+            buf, length = [], 0
+    if buf:
+        yield ''.join(buf)
+
+
+def _iter_flat(kind, roots):
+    # Une ligne [id, parent, position, ...champs] par nœud, en ordre préfixe :
+    # le parent précède toujours ses enfants, le client reconstruit en une passe.
+    fields = ()
+    for root in roots:
+        fields = _node_fields(root)[0]
+        break
+    yield json.dumps({"kind": kind, "format": "flat",
+                      "fields": ["id", "parent", "slot", *fields]})[:-1] + ', "nodes": ['
+    next_id = 0
+    stack = [(root, -1, slot) for slot, root in reversed(list(enumerate(roots)))]
+    while stack:
+        node, parent, slot = stack.pop()
+        if node is None:
+            continue
+        row = [next_id, parent, slot, *_node_fields(node)[1]]
+        yield ('' if next_id == 0 else ',') + json.dumps(row)
+        children = node_children(node)
+        for i in range(len(children) - 1, -1, -1):
+            stack.append((children[i], next_id, i))
+        next_id += 1
+    yield ']}'
+
+
+def _iter_nested(kind, roots):
+    # Parcours itératif : un itérateur d'enfants par niveau au lieu de la récursion
+    yield json.dumps({"kind": kind, "format": "nested"})[:-1] + ', "roots": ['
+    stack = [iter(roots)]
+    first = [True]
+    while stack:
+        node = next(stack[-1], StopIteration)
+        if node is StopIteration:
+            stack.pop()
+            first.pop()
+            yield ']}'
+            continue
+        sep = '' if first[-1] else ','
+        first[-1] = False
+        if node is None:
+            yield sep + 'null'
+            continue
+        fields, values = _node_fields(node)
+        yield sep + json.dumps(dict(zip(fields, values)))[:-1] + ', "children": ['
+        stack.append(iter(node_children(node)))
+        first.append(True)
+
+
+def export_tree(kind, root, fmt="flat"):
+    """Sérialise un arbre (ou une liste de racines) en morceaux JSON à envoyer en flux."""
+    if root is None:
+        roots = []
+    elif isinstance(root, list):
+        roots = root
+    else:
+        roots = [root]
+    if fmt == "flat":
+        return _buffered(_iter_flat(kind, roots))
+    if fmt == "nested":
+        return _buffered(_iter_nested(kind, roots))
+    raise ValueError("Format invalide : choisissez 'flat' ou 'nested'.")